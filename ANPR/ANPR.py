@@ -1,139 +1,796 @@
 import os
+import re
+import threading
+import time
 import cv2
 import imutils
-import easyocr
 import numpy as np
 from matplotlib import pyplot as plt
 
-class ANPR:
-    def __init__(self):
-        print("Initializing OCR reader one time...")
-        self.reader = easyocr.Reader(['en'])
-        self.img = None
+
+def box_iou(a, b):
+    """IoU of two (x, y, w, h) boxes."""
+    iw = min(a[0] + a[2], b[0] + b[2]) - max(a[0], b[0])
+    ih = min(a[1] + a[3], b[1] + b[3]) - max(a[1], b[1])
+    if iw <= 0 or ih <= 0:
+        return 0.0
+    inter = iw * ih
+    return inter / float(a[2] * a[3] + b[2] * b[3] - inter)
+
+
+def sharpness(gray):
+    """Variance of the Laplacian: low for blurred images."""
+    return float(cv2.Laplacian(gray, cv2.CV_64F).var())
+
+
+def vote_plate(reads):
+    """
+    Fuse several (text, confidence) reads of one plate.
+    Reads are grouped by their number of letters/digits and the group with
+    the most total confidence wins; each position then takes the character
+    with the most confidence behind it. Separators come from the most
+    confident read of the group. Returns (text, confidence), the latter
+    being the mean per-position support divided by the number of reads.
+    """
+    groups = {}
+    for text, conf in reads:
+        chars = [ch for ch in text.upper() if ch.isalnum()]
+        if chars:
+            groups.setdefault(len(chars), []).append((text.upper(), chars, conf))
+    if not groups:
+        return None, None
+
+    group = max(groups.values(), key=lambda g: (sum(r[2] for r in g), len(g)))
+    voted, support = [], []
+    for i in range(len(group[0][1])):
+        weights = {}
+        for _, chars, conf in group:
+            weights[chars[i]] = weights.get(chars[i], 0.0) + conf
+        ch = max(weights, key=weights.get)
+        voted.append(ch)
+        support.append(weights[ch] / len(reads))
+
+    # put the voted characters into the best read's layout
+    template = max(group, key=lambda r: r[2])[0]
+    out, j = [], 0
+    for ch in template:
+        if ch.isalnum():
+            out.append(voted[j])
+            j += 1
+        else:
+            out.append(ch)
+    return "".join(out), round(float(np.mean(support)), 4)
+
+
+class PlateRead:
+    """
+    Everything one ANPR pass produced for one image.
+    Created per call and never shared, so concurrent detections can't
+    overwrite each other's intermediate images.
+    """
+
+    def __init__(self, img=None):
+        self.img = img
         self.gray = None
         self.edged = None
+        self.scale = 1.0    # edged/img size ratio (fast localizer)
+        self.candidates = []   # ranked plate regions, see _crop_plate()
         self.contour = None
         self.cropped = None
+        self.bbox = None    # (x, y, w, h) of the plate in img
         self.text = None
+        self.confidence = None
+        self.valid = False  # text matched the plate pattern + min confidence
+        self.timings = {}   # stage -> ms
+        self.frames = []    # read_burst(): the frames that were OCR'd
+        self.cached = None  # "content" / "crop" when served by the cache
+
+    def to_dict(self):
+        """JSON-friendly summary (no images)."""
+        return {
+            "text": self.text,
+            "confidence": self.confidence,
+            "valid": self.valid,
+            "bbox": list(self.bbox) if self.bbox else None,
+            "timings": self.timings,
+            "candidates": [
+                {
+                    "bbox": list(c["bbox"]),
+                    "text": c["text"],
+                    "confidence": c["confidence"],
+                    "valid": c["valid"],
+                }
+                for c in self.candidates
+            ],
+            "frames": self.frames,
+            "cached": self.cached,
+        }
+
+    def without_images(self):
+        """Copy of the result that keeps only the small plate crop."""
+        kept = PlateRead()
+        kept.contour = self.contour
+        kept.bbox = self.bbox
+        kept.cropped = None if self.cropped is None else self.cropped.copy()
+        kept.text = self.text
+        kept.confidence = self.confidence
+        kept.valid = self.valid
+        kept.candidates = [{k: v for k, v in c.items() if k != "crop"}
+                           for c in self.candidates]
+        kept.timings = dict(self.timings)
+        kept.frames = list(self.frames)
+        return kept
+
+
+class ANPR:
+    def __init__(self, ocr_workers=0, ocr_timeout=10.0, localizer="full",
+                 fast_max_side=1024, fast_top_k=10, plate_aspect=(1.5, 6.5),
+                 max_candidates=5, ocr_batch=3,
+                 plate_pattern=r"^[A-Z0-9][A-Z0-9 -]{2,10}[A-Z0-9]$",
+                 min_confidence=0.3, cache=None):
+        """
+        ocr_workers > 0 runs OCR in that many worker processes (each with
+        its own reader) instead of inline on the calling thread.
+        The reader (or the worker pool) is created on first use, or ahead
+        of time by load()/warm_up().
+
+        localizer="fast" finds the plate on a copy downscaled to
+        fast_max_side, only tries the fast_top_k largest contours and skips
+        quads whose width/height is outside plate_aspect. "full" is the
+        original search over every contour at full resolution.
+
+        Up to max_candidates plate regions are kept, largest first, and
+        OCR'd ocr_batch at a time until one reads as a plate: the text
+        (uppercased) matches plate_pattern with at least min_confidence.
+
+        cache (a PlateCache) returns earlier reads of the same image, and
+        with crop_hash on, of the same plate crop, without OCR.
+        """
+        if localizer not in ("full", "fast"):
+            raise ValueError("localizer must be 'full' or 'fast'")
+        self.localizer = localizer
+        self.fast_max_side = fast_max_side
+        self.fast_top_k = fast_top_k
+        self.plate_aspect = plate_aspect
+        self.max_candidates = max(1, max_candidates)
+        self.ocr_batch = max(1, ocr_batch)
+        self.plate_pattern = re.compile(plate_pattern)
+        self.min_confidence = min_confidence
+        self.cache = cache
+
+        self.ocr_pool = None
+        self.reader = None
+        self.ocr_workers = ocr_workers
+        self.ocr_pool_ready = False
+        self.load_lock = threading.Lock()
+
+        if ocr_workers:
+            from ANPR.OCRPool import OCRPool
+            self.ocr_pool = OCRPool(workers=ocr_workers, timeout=ocr_timeout)
+
+        self.last_read = PlateRead()
+
+    # Last result, kept for scripts that call detect() then render()/save()
+    img = property(lambda self: self.last_read.img)
+    gray = property(lambda self: self.last_read.gray)
+    edged = property(lambda self: self.last_read.edged)
+    contour = property(lambda self: self.last_read.contour)
+    cropped = property(lambda self: self.last_read.cropped)
+    text = property(lambda self: self.last_read.text)
 
     # --------------------------
-    # PRIVATE HELPERS
+    # MODEL LOADING
     # --------------------------
 
-    def _load_image(self, path):
-        self.img = cv2.imread(path)
-        if self.img is None:
-            raise FileNotFoundError("Image not found: " + path)
-
-    def _preprocess_internal(self):
-        self.gray = cv2.cvtColor(self.img, cv2.COLOR_BGR2GRAY)
-        bfilter = cv2.bilateralFilter(self.gray, 11, 17, 17)
-        self.edged = cv2.Canny(bfilter, 30, 200)
-
-    def _find_plate_contour(self):
-        cnts = cv2.findContours(
-            self.edged.copy(), cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE)
-        cnts = imutils.grab_contours(cnts)
-        cnts = sorted(cnts, key=cv2.contourArea, reverse=True)
-
-        for c in cnts:
-            approx = cv2.approxPolyDP(c, 10, True)
-            if len(approx) == 4:
-                self.contour = approx
+    def load(self):
+        """Create the OCR reader / start the workers once (thread-safe)."""
+        if self.is_loaded():
+            return
+        with self.load_lock:
+            if self.is_loaded():
                 return
+            if self.ocr_pool is not None:
+                print(f"Starting {self.ocr_workers} OCR worker processes...")
+                self.ocr_pool.warm_up()
+                self.ocr_pool_ready = True
+            else:
+                # easyocr pulls in torch: import it only when needed
+                import easyocr
+                print("Initializing OCR reader one time...")
+                self.reader = easyocr.Reader(['en'])
 
-        self.contour = None
+    def is_loaded(self):
+        if self.ocr_pool is not None:
+            return self.ocr_pool_ready
+        return self.reader is not None
+
+    def warm_up(self):
+        """Load + one OCR call on a blank plate, so the first gate is fast."""
+        self.load()
+        self._readtext(np.zeros((40, 160), dtype=np.uint8))
+
+    # --------------------------
+    # PRIVATE HELPERS
+    # --------------------------
+
+    def _load_image(self, image):
+        """
+        Accepts a file path, encoded image bytes (JPEG/PNG straight from a
+        camera or upload) or an already decoded BGR/gray numpy array.
+        Arrays are used as-is, without a copy or a disk round-trip.
+        """
+        if isinstance(image, np.ndarray):
+            img = image
+        elif isinstance(image, (bytes, bytearray, memoryview)):
+            img = cv2.imdecode(np.frombuffer(image, np.uint8), cv2.IMREAD_COLOR)
+            if img is None:
+                raise ValueError("Could not decode image bytes")
+        else:
+            img = cv2.imread(str(image))
+            if img is None:
+                raise FileNotFoundError("Image not found: " + str(image))
+
+        if img.ndim == 2:
+            img = cv2.cvtColor(img, cv2.COLOR_GRAY2BGR)
+        return PlateRead(img)
+
+    def _preprocess_internal(self, read):
+        read.gray = cv2.cvtColor(read.img, cv2.COLOR_BGR2GRAY)
+        work = read.gray
+
+        # The filter size and approx epsilon below are tuned for ~1000 px
+        # frames, so the fast path works at about that size.
+        read.scale = 1.0
+        if self.localizer == "fast":
+            h, w = read.gray.shape
+            scale = self.fast_max_side / float(max(h, w))
+            if scale < 1.0:
+                size = (max(1, int(w * scale)), max(1, int(h * scale)))
+                work = cv2.resize(read.gray, size, interpolation=cv2.INTER_AREA)
+                read.scale = scale
 
-    def _crop_plate(self):
-        if self.contour is None:
-            self.cropped = None
+        bfilter = cv2.bilateralFilter(work, 11, 17, 17)
+        read.edged = cv2.Canny(bfilter, 30, 200)
+
+    def _add_candidate(self, read, contour):
+        """
+        Keep a quad unless it repeats one already kept (e.g. the inner and
+        outer edge of the same plate border). True once the list is full.
+        """
+        box = cv2.boundingRect(contour)
+        for other in read.candidates:
+            if box_iou(box, cv2.boundingRect(other)) > 0.7:
+                return False
+        read.candidates.append(contour)
+        return len(read.candidates) >= self.max_candidates
+
+    def _find_plate_contour(self, read):
+        read.candidates = []
+        if self.localizer == "fast":
+            self._find_plate_contour_fast(read)
+        else:
+            cnts = cv2.findContours(
+                read.edged.copy(), cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE)
+            cnts = imutils.grab_contours(cnts)
+            cnts = sorted(cnts, key=cv2.contourArea, reverse=True)
+
+            for c in cnts:
+                approx = cv2.approxPolyDP(c, 10, True)
+                if len(approx) == 4 and self._add_candidate(read, approx):
+                    break
+
+        read.contour = read.candidates[0] if read.candidates else None
+
+    def _find_plate_contour_fast(self, read):
+        """
+        Plate-shaped quads among the top-k contours by area.
+        RETR_LIST, not RETR_EXTERNAL: the plate is usually nested inside
+        the car's outline and would be dropped by an outer-only search.
+        """
+        cnts = imutils.grab_contours(cv2.findContours(
+            read.edged, cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE))
+        if not cnts:
             return
 
-        mask = np.zeros(self.gray.shape, np.uint8)
-        cv2.drawContours(mask, [self.contour], 0, 255, -1)
+        # one area per contour, then only sort the k largest
+        areas = np.array([cv2.contourArea(c) for c in cnts])
+        k = min(self.fast_top_k, len(cnts))
+        top = np.argpartition(-areas, k - 1)[:k]
+        top = top[np.argsort(-areas[top], kind="stable")]
 
-        (x, y) = np.where(mask == 255)
-        (x1, y1), (x2, y2) = (np.min(x), np.min(y)), (np.max(x), np.max(y))
+        low, high = self.plate_aspect
+        for i in top:
+            approx = cv2.approxPolyDP(cnts[i], 10, True)
+            if len(approx) != 4:
+                continue
+            _, _, w, h = cv2.boundingRect(approx)
+            if h == 0 or not low <= w / h <= high:
+                continue
+            # back to full-resolution coordinates
+            contour = np.round(approx / read.scale).astype(np.int32)
+            if self._add_candidate(read, contour):
+                return
 
-        self.cropped = self.gray[x1:x2 + 1, y1:y2 + 1]
+    def _crop_plate(self, read):
+        """
+        Turn the candidate quads into
+        {"contour", "bbox", "crop", "text", "confidence", "valid"} dicts,
+        cropped from the gray image (bounding box clipped to the frame).
+        The first one is the plate until OCR picks another.
+        """
+        rows, cols = read.gray.shape
+        candidates = []
+        for contour in read.candidates:
+            x, y, w, h = cv2.boundingRect(contour)
+            x1, y1 = max(x, 0), max(y, 0)
+            x2, y2 = min(x + w, cols), min(y + h, rows)
+            if x2 <= x1 or y2 <= y1:
+                continue
+            candidates.append({
+                "contour": contour,
+                "bbox": (x1, y1, x2 - x1, y2 - y1),
+                "crop": read.gray[y1:y2, x1:x2],
+                "text": None,
+                "confidence": None,
+                "valid": False,
+            })
+        read.candidates = candidates
+        self._pick(read, candidates[0] if candidates else None)
 
-    def _ocr(self):
-        if self.cropped is None:
-            self.text = "N/A"
+    def _pick(self, read, candidate):
+        if candidate is None:
+            read.contour = read.bbox = read.cropped = None
             return
+        read.contour = candidate["contour"]
+        read.bbox = candidate["bbox"]
+        read.cropped = candidate["crop"]
+
+    def _readtext(self, image):
+        """[(text, confidence), ...] from the local reader or the pool."""
+        self.load()
+        if self.ocr_pool is not None:
+            return self.ocr_pool.readtext(image)
+        return [(text, conf) for _, text, conf in self.reader.readtext(image)]
+
+    def _readtext_batch(self, crops):
+        """
+        One [(text, confidence), ...] list per crop.
+        The pool reads the crops in parallel, all within one timeout; the
+        local reader gets them stacked into one image, so detection and
+        recognition run once for the whole batch, and every text box goes
+        back to the crop it lies on.
+        """
+        self.load()
+        if self.ocr_pool is not None:
+            futures = [self.ocr_pool.submit(crop) for crop in crops]
+            deadline = time.monotonic() + self.ocr_pool.timeout
+            results = []
+            for future in futures:
+                try:
+                    results.append(future.result(
+                        timeout=max(0.0, deadline - time.monotonic())))
+                except Exception as e:
+                    future.cancel()
+                    print(f"[WARN] OCR failed: {e!r}")
+                    results.append([])
+            return results
+
+        if len(crops) == 1:
+            return [self._readtext(crops[0])]
+
+        gap = 16
+        width = max(crop.shape[1] for crop in crops)
+        height = sum(crop.shape[0] for crop in crops) + gap * (len(crops) - 1)
+        stacked = np.full((height, width), 128, np.uint8)
+        tops = []
+        y = 0
+        for crop in crops:
+            stacked[y:y + crop.shape[0], :crop.shape[1]] = crop
+            tops.append(y)
+            y += crop.shape[0] + gap
+
+        results = [[] for _ in crops]
+        bottoms = np.array(tops) + np.array([crop.shape[0] for crop in crops])
+        for box, text, conf in self.reader.readtext(stacked):
+            xs = [p[0] for p in box]
+            center_y = sum(p[1] for p in box) / len(box)
+            i = int(np.searchsorted(bottoms, center_y, side="right"))
+            if i < len(crops) and center_y >= tops[i]:
+                results[i].append((min(xs), text, float(conf)))
 
-        result = self.reader.readtext(self.cropped)
+        # left-to-right, like the reader's own order on a single crop
+        return [[(text, conf) for _, text, conf in sorted(found, key=lambda r: r[0])]
+                for found in results]
+
+    def _is_plate(self, text, confidence):
+        return (confidence >= self.min_confidence
+                and self.plate_pattern.match(text.strip().upper()) is not None)
+
+    def _score(self, candidate, result):
+        """
+        Text of one candidate: the boxes joined left to right (plates split
+        in two) if that reads as a plate, else the most confident box.
+        """
+        result = [(text, conf) for text, conf in result if text.strip()]
         if not result:
-            self.text = "N/A"
+            candidate["text"], candidate["confidence"], candidate["valid"] = None, None, False
+            return
+
+        options = []
+        if len(result) > 1:
+            joined = " ".join(text for text, _ in result)
+            options.append((joined, min(conf for _, conf in result)))
+        options.append(max(result, key=lambda r: r[1]))
+
+        for text, conf in options:
+            if self._is_plate(text, conf):
+                break
         else:
-            best = max(result, key=lambda r: r[2])
-            self.text = best[1]
+            text, conf = options[-1]
+
+        candidate["text"] = text
+        candidate["confidence"] = round(float(conf), 4)
+        candidate["valid"] = self._is_plate(text, conf)
+
+    def _finish(self, read):
+        """The first valid candidate in rank order, else the first with any text."""
+        chosen = next((c for c in read.candidates if c["valid"]), None)
+        if chosen is None:
+            chosen = next((c for c in read.candidates if c["text"]), None)
+
+        if chosen is None:
+            read.text, read.confidence, read.valid = "N/A", None, False
+            return
+        self._pick(read, chosen)
+        read.text = chosen["text"]
+        read.confidence = chosen["confidence"]
+        read.valid = chosen["valid"]
+
+    def _ocr(self, reads):
+        """
+        OCR the candidates of every read in rank order, ocr_batch per read
+        per round, all in one batch call; a read stops at the first round
+        that gives it a valid plate.
+        """
+        pending = [read for read in reads if read.candidates]
+        start = 0
+        while pending:
+            jobs = [(read, c) for read in pending
+                    for c in read.candidates[start:start + self.ocr_batch]]
+            if not jobs:
+                break
+
+            started = time.perf_counter()
+            results = self._readtext_batch([c["crop"] for _, c in jobs])
+            elapsed = 1000 * (time.perf_counter() - started)
+
+            for (_, candidate), result in zip(jobs, results):
+                self._score(candidate, result)
+            for read in pending:
+                read.timings["ocr"] = round(read.timings.get("ocr", 0.0) + elapsed, 2)
+
+            start += self.ocr_batch
+            pending = [read for read in pending
+                       if not any(c["valid"] for c in read.candidates)]
+
+        for read in reads:
+            read.timings.setdefault("ocr", 0.0)
+            self._finish(read)
+
+    def _from_cache(self, image, started):
+        """
+        (content key, PlateRead copy of a cached read or None, image). A
+        path comes back as the file's bytes, so a miss decodes the bytes
+        that were hashed instead of reading the file again.
+        """
+        from ANPR.PlateCache import content_key
+        if (not isinstance(image, (np.ndarray, bytes, bytearray, memoryview))
+                and os.path.isfile(str(image))):
+            with open(str(image), "rb") as f:
+                image = f.read()
+        key = content_key(image)
+        hit = self.cache.get(key)
+        if hit is None:
+            return key, None, image
+
+        read = hit.without_images()
+        if isinstance(image, np.ndarray):
+            read.img = image
+        read.cached = "content"
+        elapsed = round(1000 * (time.perf_counter() - started), 3)
+        read.timings = {"cache": elapsed, "total": elapsed}
+        return key, read, image
+
+    def _from_crop_cache(self, read):
+        """Fill `read` from a cached read of one of its plate crops."""
+        from ANPR.PlateCache import dhash
+        for candidate in read.candidates:
+            hit = self.cache.get_crop(dhash(candidate["crop"]))
+            if hit is None:
+                continue
+            candidate["text"] = hit.text
+            candidate["confidence"] = hit.confidence
+            candidate["valid"] = hit.valid
+            self._pick(read, candidate)
+            read.text, read.confidence, read.valid = hit.text, hit.confidence, hit.valid
+            read.cached = "crop"
+            read.timings["ocr"] = 0.0
+            return True
+        return False
+
+    def _store(self, key, read):
+        """Cache a finished read (not failed ones: OCR timeouts are transient)."""
+        if read.text == "N/A":
+            return
+        kept = read.without_images()
+        self.cache.put(key, kept)
+        if self.cache.crop_hash and read.cropped is not None:
+            from ANPR.PlateCache import dhash
+            self.cache.put_crop(dhash(read.cropped), kept)
+
+    def _localize(self, image):
+        """Everything before OCR: load, preprocess, find + crop the plates."""
+        started = time.perf_counter()
+        read = self._load_image(image)
+        self._preprocess_internal(read)
+        self._find_plate_contour(read)
+        self._crop_plate(read)
+        read.timings["localize"] = round(1000 * (time.perf_counter() - started), 2)
+        return read
+
+    def _total(self, read):
+        read.timings["total"] = round(read.timings["localize"] + read.timings["ocr"], 2)
 
     # --------------------------
     # PUBLIC API
     # --------------------------
 
-    def preprocess(self, image_path):
+    def preprocess(self, image):
         """Return gray + edged for debugging."""
-        self._load_image(image_path)
-        self._preprocess_internal()
-        return self.gray, self.edged
-
-    def detect(self, image_path):
-        """Main ANPR pipeline. Stores everything internally."""
-        self._load_image(image_path)
-        self._preprocess_internal()
-        self._find_plate_contour()
-        self._crop_plate()
-        self._ocr()
-        return self.text
-
-    def render(self, show=True):
+        read = self._load_image(image)
+        self._preprocess_internal(read)
+        self.last_read = read
+        return read.gray, read.edged
+
+    def read(self, image):
+        """
+        Main ANPR pipeline, returning a PlateRead: text, confidence, valid,
+        bbox, timings (ms) and the ranked candidates (to_dict() for JSON).
+        `image` is a path, encoded bytes or a numpy array.
+        Keeps no per-call state on the engine, so it is safe to call from
+        several threads at once.
+        """
+        return self.read_many([image])[0]
+
+    def read_many(self, images):
+        """
+        Read several plates at once. Each OCR round batches the candidates
+        of every image still without a valid plate.
+        """
+        images = list(images)
+        reads = [None] * len(images)
+        keys = [None] * len(images)
+
+        if self.cache is not None:
+            for i, image in enumerate(images):
+                keys[i], reads[i], images[i] = self._from_cache(
+                    image, time.perf_counter())
+
+        misses = [i for i, read in enumerate(reads) if read is None]
+        for i in misses:
+            reads[i] = self._localize(images[i])
+
+        pending = [reads[i] for i in misses]
+        if self.cache is not None and self.cache.crop_hash:
+            pending = [read for read in pending if not self._from_crop_cache(read)]
+        self._ocr(pending)
+
+        for i in misses:
+            self._total(reads[i])
+            if self.cache is not None:
+                self._store(keys[i], reads[i])
+        return reads
+
+    def _load_burst(self, frames, max_frames):
+        """BGR frames from a list (paths/bytes/arrays) or a video clip path."""
+        if isinstance(frames, (str, os.PathLike)):
+            capture = cv2.VideoCapture(str(frames))
+            if not capture.isOpened():
+                raise FileNotFoundError("Clip not found: " + str(frames))
+            images = []
+            try:
+                while len(images) < max_frames:
+                    ok, frame = capture.read()
+                    if not ok:
+                        break
+                    images.append(frame)
+            finally:
+                capture.release()
+        else:
+            images = [self._load_image(frame).img for frame in list(frames)[:max_frames]]
+
+        if not images:
+            raise ValueError("No frames to read")
+        return images
+
+    def _follow(self, previous, gray, box, min_score):
+        """
+        Where the plate at `box` in `previous` moved to in `gray`: template
+        match inside a window of one plate size around it, or None.
+        """
+        if previous.shape != gray.shape:
+            return None
+        x, y, w, h = box
+        rows, cols = gray.shape
+        x1, y1 = max(x - w, 0), max(y - h, 0)
+        x2, y2 = min(x + 2 * w, cols), min(y + 2 * h, rows)
+        window = gray[y1:y2, x1:x2]
+        if window.shape[0] < h or window.shape[1] < w:
+            return None
+
+        scores = cv2.matchTemplate(window, previous[y:y + h, x:x + w], cv2.TM_CCOEFF_NORMED)
+        _, best, _, (bx, by) = cv2.minMaxLoc(scores)
+        if best < min_score:
+            return None
+        return (x1 + bx, y1 + by, w, h)
+
+    def _track(self, grays, anchor, box, min_score):
+        """Plate box per frame (None once lost), outwards from the anchor."""
+        boxes = [None] * len(grays)
+        boxes[anchor] = box
+        for step in (1, -1):
+            current, i = box, anchor + step
+            while 0 <= i < len(grays):
+                current = self._follow(grays[i - step], grays[i], current, min_score)
+                if current is None:
+                    break
+                boxes[i] = current
+                i += step
+        return boxes
+
+    def read_burst(self, frames, max_ocr=3, max_frames=30, min_track_score=0.5):
+        """
+        Read one plate from a short burst of frames of the same vehicle:
+        a list of paths/bytes/arrays, or the path of a video clip (first
+        max_frames frames).
+
+        The sharpest frame is read as usual (candidates + early exit) and
+        its plate box is tracked through the other frames by template
+        matching. The max_ocr - 1 sharpest tracked plate crops are OCR'd
+        in one batch and all reads are fused per character by confidence
+        (vote_plate). So at most max_ocr frames are OCR'd, whatever the
+        burst length. Returns the anchor frame's PlateRead with the fused
+        text; read.frames lists the frames that were read.
+        """
+        started = time.perf_counter()
+        images = self._load_burst(frames, max_frames)
+        grays = [cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) for img in images]
+
+        # cheap blur metric on a small copy of each frame
+        small = [cv2.resize(g, (320, max(1, g.shape[0] * 320 // g.shape[1])),
+                            interpolation=cv2.INTER_AREA) for g in grays]
+        anchor = int(np.argmax([sharpness(g) for g in small]))
+
+        read = self._localize(images[anchor])
+        self._ocr([read])
+        localized = time.perf_counter()
+
+        reads = []
+        if read.text != "N/A":
+            reads.append((read.text, read.confidence))
+            read.frames.append({"frame": anchor, "sharpness": round(sharpness(read.cropped), 1),
+                                "text": read.text, "confidence": read.confidence})
+
+        if read.bbox is not None and max_ocr > 1 and len(images) > 1:
+            boxes = self._track(grays, anchor, read.bbox, min_track_score)
+            tracked = []
+            for i, box in enumerate(boxes):
+                if box is None or i == anchor:
+                    continue
+                x, y, w, h = box
+                crop = grays[i][y:y + h, x:x + w]
+                tracked.append((sharpness(crop), i, crop))
+            tracked.sort(key=lambda t: (-t[0], t[1]))
+            tracked = tracked[:max_ocr - 1]
+            read.timings["track"] = round(1000 * (time.perf_counter() - localized), 2)
+
+            if tracked:
+                ocr_started = time.perf_counter()
+                results = self._readtext_batch([crop for _, _, crop in tracked])
+                read.timings["ocr"] = round(
+                    read.timings["ocr"] + 1000 * (time.perf_counter() - ocr_started), 2)
+
+                for (score, i, _), result in zip(tracked, results):
+                    scored = {}
+                    self._score(scored, result)
+                    if scored["text"]:
+                        reads.append((scored["text"], scored["confidence"]))
+                    read.frames.append({"frame": i, "sharpness": round(score, 1),
+                                        "text": scored["text"],
+                                        "confidence": scored["confidence"]})
+
+        if len(reads) > 1:
+            # valid reads only, when there are any
+            valid = [r for r in reads if self._is_plate(*r)]
+            read.text, read.confidence = vote_plate(valid or reads)
+            read.valid = self._is_plate(read.text, read.confidence)
+        elif reads:
+            # one frame read it (often a tracked one, the anchor had glare)
+            read.text, read.confidence = reads[0]
+            read.valid = self._is_plate(read.text, read.confidence)
+
+        read.timings["total"] = round(1000 * (time.perf_counter() - started), 2)
+        return read
+
+    def close(self):
+        if self.ocr_pool is not None:
+            self.ocr_pool.close()
+
+    def detect(self, image):
+        """
+        Main ANPR pipeline. Returns the text and keeps the full PlateRead
+        in last_read (see read()).
+        """
+        self.last_read = self.read(image)
+        return self.last_read.text
+
+    def render(self, show=True, read=None):
         """Return rendered image with plate + text."""
-        if self.img is None:
+        read = read or self.last_read
+        if read.img is None:
             raise RuntimeError("Run detect() first.")
 
-        output = self.img.copy()
+        output = read.img.copy()
 
-        if self.contour is not None:
-            cv2.drawContours(output, [self.contour], -1, (0, 255, 0), 3)
-            x, y = self.contour[0][0]
-            cv2.putText(output, self.text, (x, y - 10),
+        if read.contour is not None:
+            cv2.drawContours(output, [read.contour], -1, (0, 255, 0), 3)
+            x, y = read.contour[0][0]
+            cv2.putText(output, read.text, (x, y - 10),
                         cv2.FONT_HERSHEY_SIMPLEX, 1.0,
                         (0, 255, 0), 2)
 
         # Use matplotlib to show the image
         if show:
             plt.imshow(cv2.cvtColor(output, cv2.COLOR_BGR2RGB))
-            plt.title(f"Detected: {self.text}")
+            plt.title(f"Detected: {read.text}")
             plt.axis("off")
             plt.show()
 
         # return output
         return output
 
-    def save(self, folder, prefix="output"):
-        """Save rendered, cropped, edged, and gray to folder."""
+    def save(self, folder, prefix="output", read=None, kinds=None,
+             params=None):
+        """
+        Save rendered, cropped, edged, and gray to folder.
+        `read` picks a PlateRead (defaults to the last detect()), `kinds`
+        limits which images are written, `params` are extra cv2.imwrite
+        flags (e.g. JPEG quality). Returns the written paths.
+        """
+        read = read or self.last_read
+        kinds = kinds or ("rendered", "gray", "edged", "plate")
+        params = params or []
 
         # Create folder if doesn't exist
         os.makedirs(folder, exist_ok=True)
 
+        images = {
+            "gray": read.gray,
+            "edged": read.edged,
+            "plate": read.cropped,
+        }
         # Save rendered image
-        rendered = self.render(show=False)
-        cv2.imwrite(os.path.join(folder, f"{prefix}_rendered.jpg"), rendered)
-
-        # Save grayscale
-        if self.gray is not None:
-            cv2.imwrite(os.path.join(folder, f"{prefix}_gray.jpg"), self.gray)
-
-        # Save edged image
-        if self.edged is not None:
-            cv2.imwrite(os.path.join(
-                folder, f"{prefix}_edged.jpg"), self.edged)
+        if "rendered" in kinds and read.img is not None:
+            images["rendered"] = self.render(show=False, read=read)
 
-        # Save cropped plate
-        if self.cropped is not None:
-            cv2.imwrite(os.path.join(
-                folder, f"{prefix}_plate.jpg"), self.cropped)
+        paths = []
+        for kind in kinds:
+            image = images.get(kind)
+            if image is None:
+                continue
+            path = os.path.join(folder, f"{prefix}_{kind}.jpg")
+            cv2.imwrite(path, image, params)
+            paths.append(path)
 
         print(f"Saved outputs to folder: {folder}")
+        return paths
@@ -0,0 +1,112 @@
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+# One EasyOCR reader per worker process, created by the initializer
+_reader = None
+
+
+def _init_worker(languages, gpu):
+    global _reader
+    import easyocr
+    _reader = easyocr.Reader(languages, gpu=gpu)
+
+
+def _warm_up(_):
+    """
+    No OCR: the reader is loaded by _init_worker when a worker starts. The
+    sleep only keeps this worker busy so the next task goes to (and spawns)
+    another one, spreading the warm-up tasks across the pool.
+    """
+    time.sleep(0.1)
+    return True
+
+
+def _readtext(image):
+    # (text, confidence) pairs; bounding boxes stay in the worker
+    return [(text, float(conf)) for _, text, conf in _reader.readtext(image)]
+
+
+class OCRPool:
+    """
+    Pool of worker processes, each holding its own pre-loaded EasyOCR reader,
+    so plate crops from several gates are recognized in parallel on all cores.
+
+    - submit(image) -> Future of [(text, confidence), ...]
+    - readtext(image) blocks with a timeout and returns [] when it expires
+    - workers are replaced after `max_tasks_per_worker` crops (memory
+      creep) and the pool is rebuilt if a worker dies. Replacements start
+      on demand, so the first crop a new worker gets waits for its reader
+      to load, inside the caller's timeout; None turns recycling off.
+
+    Workers use the "spawn" start method because forking a process that
+    already loaded torch is unsafe. As with any spawn pool, the main script
+    must be import-safe.
+    """
+
+    def __init__(self, workers=2, languages=("en",), gpu=False, timeout=10.0,
+                 max_tasks_per_worker=500):
+        self.workers = workers
+        self.languages = list(languages)
+        self.gpu = gpu
+        self.timeout = timeout
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self.executor = None
+        self.lock = threading.Lock()   # one start/rebuild at a time
+
+    def _start(self):
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.languages, self.gpu),
+            max_tasks_per_child=self.max_tasks_per_worker,
+        )
+
+    def _get_executor(self, broken=None):
+        """The running executor; a new one when missing or it is `broken`."""
+        with self.lock:
+            if self.executor is not None and self.executor is broken:
+                print("[WARN] OCR worker died, restarting pool")
+                self.executor.shutdown(wait=False, cancel_futures=True)
+                self.executor = None
+            if self.executor is None:
+                self._start()
+            return self.executor
+
+    # ------------------------------------------------------------
+    # PUBLIC API
+    # ------------------------------------------------------------
+
+    def warm_up(self):
+        """Start the workers and load their readers before the first plate."""
+        executor = self._get_executor()
+        list(executor.map(_warm_up, range(self.workers)))
+
+    def submit(self, image):
+        executor = self._get_executor()
+        try:
+            return executor.submit(_readtext, image)
+        except BrokenProcessPool:
+            # another thread may have rebuilt it already
+            return self._get_executor(broken=executor).submit(_readtext, image)
+
+    def readtext(self, image, timeout=None):
+        future = self.submit(image)
+        try:
+            return future.result(timeout=timeout or self.timeout)
+        except TimeoutError:
+            future.cancel()
+            print("[WARN] OCR timed out")
+            return []
+        except BrokenProcessPool:
+            print("[WARN] OCR worker died")
+            return []
+
+    def close(self):
+        with self.lock:
+            executor, self.executor = self.executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
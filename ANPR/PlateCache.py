@@ -0,0 +1,132 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+
+def content_key(image):
+    """
+    blake2b digest of what the caller passed: the encoded bytes, the file's
+    bytes for a path, or shape + pixels for an array. No decoding needed.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    if isinstance(image, np.ndarray):
+        h.update(str((image.shape, image.dtype.str)).encode())
+        h.update(np.ascontiguousarray(image).data)
+    elif isinstance(image, (bytes, bytearray, memoryview)):
+        h.update(image)
+    else:
+        path = str(image)
+        if not os.path.isfile(path):
+            return None
+        with open(path, "rb") as f:
+            h.update(f.read())
+    return h.digest()
+
+
+def dhash(gray, size=8):
+    """Difference hash of a plate crop: size*size bits as an int."""
+    small = cv2.resize(gray, (size + 1, size), interpolation=cv2.INTER_AREA)
+    return int.from_bytes(np.packbits(small[:, 1:] > small[:, :-1]).tobytes(), "big")
+
+
+class PlateCache:
+    """
+    Bounded LRU caches of plate reads with a time-to-live.
+
+    - content entries: content_key(image) -> result, so a frame sent again
+      (retries, scenes reusing an image) skips decoding, search and OCR
+    - crop entries (crop_hash=True): dHash of the chosen plate crop ->
+      result; a crop within crop_max_distance bits of a cached one (a
+      re-encoded or slightly shifted frame of the same plate) skips OCR.
+      Off by default: two similar plates can come that close.
+
+    Each kind keeps at most max_entries. Thread-safe; stats() reports
+    hits, misses, evictions and expirations.
+    """
+
+    def __init__(self, max_entries=256, ttl_s=300.0, crop_hash=False,
+                 crop_max_distance=10):
+        self.max_entries = max(1, max_entries)
+        self.ttl_s = ttl_s
+        self.crop_hash = crop_hash
+        self.crop_max_distance = crop_max_distance
+        self.entries = OrderedDict()   # content key -> (expires_at, value)
+        self.crops = OrderedDict()     # dHash -> (expires_at, value)
+        self.lock = threading.Lock()
+        self.counts = {"hits": 0, "misses": 0, "crop_hits": 0, "crop_misses": 0,
+                       "evictions": 0, "expired": 0}
+
+    def _expire(self, table, now):
+        for key in [k for k, (expires, _) in table.items() if expires < now]:
+            del table[key]
+            self.counts["expired"] += 1
+
+    def _put(self, table, key, value):
+        expires = time.monotonic() + self.ttl_s if self.ttl_s else float("inf")
+        with self.lock:
+            table[key] = (expires, value)
+            table.move_to_end(key)
+            while len(table) > self.max_entries:
+                table.popitem(last=False)
+                self.counts["evictions"] += 1
+
+    # ------------------------------------------------------------
+    # PUBLIC API
+    # ------------------------------------------------------------
+
+    def get(self, key):
+        """Cached value for a content key, or None."""
+        if key is None:
+            return None
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] < time.monotonic():
+                del self.entries[key]
+                self.counts["expired"] += 1
+                entry = None
+            if entry is None:
+                self.counts["misses"] += 1
+                return None
+            self.entries.move_to_end(key)
+            self.counts["hits"] += 1
+            return entry[1]
+
+    def put(self, key, value):
+        if key is not None:
+            self._put(self.entries, key, value)
+
+    def get_crop(self, crop_hash):
+        """Value of the closest cached crop within crop_max_distance bits."""
+        with self.lock:
+            self._expire(self.crops, time.monotonic())
+            best, best_distance = None, self.crop_max_distance + 1
+            for key in self.crops:
+                distance = bin(key ^ crop_hash).count("1")
+                if distance < best_distance:
+                    best, best_distance = key, distance
+            if best is None:
+                self.counts["crop_misses"] += 1
+                return None
+            self.crops.move_to_end(best)
+            self.counts["crop_hits"] += 1
+            return self.crops[best][1]
+
+    def put_crop(self, crop_hash, value):
+        self._put(self.crops, crop_hash, value)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.crops.clear()
+
+    def stats(self):
+        with self.lock:
+            stats = dict(self.counts, size=len(self.entries), crop_size=len(self.crops))
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        return stats
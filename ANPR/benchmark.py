@@ -0,0 +1,95 @@
+# ANPR/benchmark.py
+#
+# Times plate localisation (preprocess + contour search + crop, no OCR)
+# for the "full" and "fast" localizers. Each is scored by the IoU of its
+# plate box with the one the full localizer finds on the native-size image.
+#
+#   python -m ANPR.benchmark                    # ./ANPR/img/test, native size
+#   python -m ANPR.benchmark --size 3840        # frames resized to 4K wide
+#
+# Resized frames show how time and accuracy scale with resolution; small
+# samples upscaled many times over are blurry, so a miss on those says
+# less than a miss on a real high-resolution camera frame.
+
+import argparse
+import glob
+import os
+import time
+
+import cv2
+import numpy as np
+
+from ANPR.ANPR import ANPR, box_iou
+
+
+def time_localize(engine, img, repeats):
+    """Median seconds per call + the last PlateRead."""
+    times = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        read = engine._localize(img)
+        times.append(time.perf_counter() - started)
+    return float(np.median(times)), read
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ANPR localisation benchmark")
+    parser.add_argument("--folder", default="./ANPR/img/test")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--size", type=int, default=0,
+                        help="resize every frame to this max side first")
+    parser.add_argument("--max-side", type=int, default=1024,
+                        help="fast localizer working size")
+    args = parser.parse_args()
+
+    engines = {
+        "full": ANPR(),
+        "fast": ANPR(localizer="fast", fast_max_side=args.max_side),
+    }
+
+    paths = sorted(glob.glob(os.path.join(args.folder, "*")))
+    totals = {name: 0.0 for name in engines}
+    hits = {name: 0 for name in engines}
+    count = 0
+
+    print(f"{'image':<16}{'size':>11}{'full ms':>10}{'fast ms':>10}"
+          f"{'full IoU':>10}{'fast IoU':>10}")
+    for path in paths:
+        img = cv2.imread(path)
+        if img is None:
+            continue
+
+        # reference plate box, from the native-size frame
+        reference = engines["full"]._localize(img).bbox
+        if args.size:
+            scale = args.size / float(max(img.shape[:2]))
+            img = cv2.resize(img, None, fx=scale, fy=scale,
+                             interpolation=cv2.INTER_AREA if scale < 1 else cv2.INTER_CUBIC)
+            if reference is not None:
+                reference = tuple(round(v * scale) for v in reference)
+
+        millis, ious = {}, {}
+        for name, engine in engines.items():
+            seconds, read = time_localize(engine, img, args.repeats)
+            totals[name] += seconds
+            millis[name] = 1000 * seconds
+            if reference is None or read.bbox is None:
+                ious[name] = 1.0 if reference is read.bbox else 0.0
+            else:
+                ious[name] = box_iou(reference, read.bbox)
+            hits[name] += ious[name] >= 0.8
+        count += 1
+
+        h, w = img.shape[:2]
+        print(f"{os.path.basename(path):<16}{f'{w}x{h}':>11}"
+              f"{millis['full']:>10.1f}{millis['fast']:>10.1f}"
+              f"{ious['full']:>10.2f}{ious['fast']:>10.2f}")
+
+    print(f"\n{count} images")
+    for name, total in totals.items():
+        print(f"{name:>5}: {1000 * total / max(count, 1):.1f} ms / image, "
+              f"{hits[name]}/{count} plates found (IoU >= 0.8)")
+
+
+if __name__ == "__main__":
+    main()
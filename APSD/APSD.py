@@ -1,24 +1,76 @@
 import os
-from ultralytics import YOLO
+import threading
+import numpy as np
+
+
+def _load_yolo(path):
+    # ultralytics pulls in torch: import it only when a model is loaded
+    from ultralytics import YOLO
+    return YOLO(path)
 
 
 class APSD:
     def __init__(self, model_path="./APSD/apsd.pt", class_list=None):
+        """The weights are loaded on first use (or by load()/warm_up())."""
         self.model_path = model_path
-        self.model = YOLO(self.model_path)
+        self.model = None
         self.class_list = class_list if class_list else ["car", "free"]
         self.last_prediction = None
+        # the ultralytics predictor keeps per-call state, so one call at a time
+        self.lock = threading.Lock()
+        self.load_lock = threading.Lock()
+
+    def load(self):
+        """Load the YOLO weights once; safe to call from several threads."""
+        if self.model is None:
+            with self.load_lock:
+                if self.model is None:
+                    self.model = _load_yolo(self.model_path)
+        return self.model
+
+    def is_loaded(self):
+        return self.model is not None
+
+    def warm_up(self, size=640):
+        """Load + one inference on a blank frame, so the first scan is fast."""
+        model = self.load()
+        with self.lock:
+            model.predict(np.zeros((size, size, 3), dtype=np.uint8), verbose=False)
 
     # json - result
     def predict(self, image):
-        self.last_prediction = self.model.predict(image)
-        return self.last_prediction
+        model = self.load()
+        with self.lock:
+            results = model.predict(image)
+        self.last_prediction = results
+        return results
+
+    def predict_batch(self, images, batch_size=None):
+        """
+        Run one inference call over many frames (e.g. one per lot camera).
+        Returns one result per input image, in the same order.
+        """
+        images = list(images)
+        if not images:
+            return []
+
+        step = batch_size or len(images)
+        results = []
+        model = self.load()
+        with self.lock:
+            for start in range(0, len(images), step):
+                results.extend(model.predict(images[start:start + step]))
+
+        self.last_prediction = results
+        return results
 
     def set_model_path(self, path):
         if not os.path.exists(path):
             raise FileNotFoundError(f"Model path '{path}' does not exist.")
-        self.model_path = path
-        self.model = YOLO(self.model_path)
+        model = _load_yolo(path)
+        with self.lock:
+            self.model_path = path
+            self.model = model
 
     def set_class_list(self, class_list):
         if isinstance(class_list, list):
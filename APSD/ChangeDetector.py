@@ -0,0 +1,116 @@
+import cv2
+import numpy as np
+
+
+class ChangeDetector:
+    """
+    Cheap check in front of YOLO: has anything changed inside the known
+    parking spots since the last frame that went through the model?
+
+    Frames are shrunk to a small blurred grayscale image with the global
+    brightness removed (so lighting drift doesn't count). The mean absolute
+    difference inside each spot box is taken from an integral image, so
+    the cost stays flat however many spots there are.
+
+    The comparison is against the frame of the last *inference*, not the
+    previous frame, so slow changes still add up and trigger a re-run.
+    `max_skips` forces a full re-run every N frames as a safety net.
+    """
+
+    def __init__(self, width=320, spot_threshold=12.0, frame_threshold=6.0,
+                 max_skips=30):
+        self.width = width
+        self.spot_threshold = spot_threshold
+        self.frame_threshold = frame_threshold
+        self.max_skips = max_skips
+
+        self.reference = None
+        self.scale = 1.0
+        self.spot_boxes = np.zeros((0, 4), dtype=np.int32)
+        self.checks_since_full = 0
+        self.stats = {"checked": 0, "skipped": 0}
+
+    # ------------------------------------------------------------
+    # HELPERS
+    # ------------------------------------------------------------
+
+    def _small(self, frame):
+        gray = frame if frame.ndim == 2 else cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        h, w = gray.shape[:2]
+        scale = min(1.0, self.width / float(w))
+        if scale < 1.0:
+            gray = cv2.resize(gray, (int(w * scale), int(h * scale)),
+                              interpolation=cv2.INTER_AREA)
+        gray = cv2.GaussianBlur(gray, (5, 5), 0).astype(np.float32)
+        return gray - gray.mean(), scale
+
+    def _box_means(self, diff):
+        """Mean of `diff` inside every spot box, via one integral image."""
+        integral = cv2.integral(diff)
+        x1, y1, x2, y2 = self.spot_boxes.T
+        sums = (integral[y2, x2] - integral[y1, x2]
+                - integral[y2, x1] + integral[y1, x1])
+        areas = np.maximum((x2 - x1) * (y2 - y1), 1)
+        return sums / areas
+
+    # ------------------------------------------------------------
+    # PUBLIC API
+    # ------------------------------------------------------------
+
+    def set_reference(self, frame, spot_coords, indexes=None):
+        """
+        Remember the frame that just went through the model. With `indexes`
+        only those spots were re-classified, so only their boxes are
+        refreshed in the reference.
+        """
+        small, scale = self._small(frame)
+        if indexes is not None and self.reference is not None \
+                and small.shape == self.reference.shape:
+            for x1, y1, x2, y2 in self.spot_boxes[list(indexes)]:
+                self.reference[y1:y2, x1:x2] = small[y1:y2, x1:x2]
+            return
+
+        self.reference, self.scale = small, scale
+        h, w = self.reference.shape
+
+        boxes = np.asarray(spot_coords, dtype=np.float32).reshape(-1, 4)
+        boxes = np.round(boxes * self.scale).astype(np.int32)
+        boxes[:, [0, 2]] = np.clip(boxes[:, [0, 2]], 0, w)
+        boxes[:, [1, 3]] = np.clip(boxes[:, [1, 3]], 0, h)
+        self.spot_boxes = boxes
+        self.checks_since_full = 0
+
+    def dirty_spots(self, frame):
+        """
+        Indexes (into the reference spot list) of spots that changed,
+        or None when the whole frame must be re-run. An empty list means
+        nothing relevant changed.
+        """
+        self.stats["checked"] += 1
+
+        if self.reference is None:
+            return None
+        if self.max_skips and self.checks_since_full >= self.max_skips:
+            return None
+
+        current, _ = self._small(frame)
+        if current.shape != self.reference.shape:
+            return None
+
+        diff = cv2.absdiff(current, self.reference)
+
+        if len(self.spot_boxes) == 0:
+            # nothing detected last time: fall back to the whole frame
+            dirty = None if diff.mean() > self.frame_threshold else []
+        else:
+            means = self._box_means(diff)
+            dirty = np.flatnonzero(means > self.spot_threshold).tolist()
+
+        if dirty is not None:
+            self.checks_since_full += 1
+        if dirty == []:
+            self.stats["skipped"] += 1
+        return dirty
+
+    def is_unchanged(self, frame):
+        return self.dirty_spots(frame) == []
@@ -1,5 +1,108 @@
 import os
+import json
 import cv2
+import numpy as np
+
+try:
+    from APSD.SpotIndex import SpotIndex
+except ImportError:   # run as a script from APSD/ (python APSD/main.py)
+    from SpotIndex import SpotIndex
+
+
+def iou_matrix(boxes_a, boxes_b):
+    """Pairwise IoU of two (N, 4) / (M, 4) xyxy box arrays -> (N, M)."""
+    a = np.asarray(boxes_a, dtype=np.float32).reshape(-1, 4)
+    b = np.asarray(boxes_b, dtype=np.float32).reshape(-1, 4)
+
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - inter
+    return np.where(union > 0, inter / np.maximum(union, 1e-9), 0.0)
+
+
+def row_major_order(coords):
+    """
+    Indexes that order (N, 4) xyxy boxes top->bottom, left->right.
+
+    A row starts at the smallest remaining y_min (its anchor) and takes
+    every box whose y_min is within 0.6 x the average box height of it.
+    Boxes are visited in y order, so only the newest row can still accept
+    a box and each row end is one searchsorted; the whole pass is
+    O(n log n) with stable sorts, giving the same order as comparing every
+    box against every row.
+    """
+    coords = np.asarray(coords).reshape(-1, 4)
+    if len(coords) == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    by_y = np.argsort(coords[:, 1], kind="stable")
+    ys = coords[by_y, 1]
+    heights = coords[:, 3] - coords[:, 1]
+    row_threshold = heights.sum() / len(heights) * 0.6
+
+    row_of = np.empty(len(ys), dtype=np.int64)
+    start, row = 0, 0
+    while start < len(ys):
+        end = max(int(np.searchsorted(ys, ys[start] + row_threshold, "left")), start + 1)
+        row_of[start:end] = row
+        start, row = end, row + 1
+
+    # lexsort is stable: ties in x keep their y order
+    return by_y[np.lexsort((coords[by_y, 0], row_of))]
+
+
+def draw_spots(image, coords, classes):
+    """Annotated copy of `image`: numbered boxes, grey for unread spots."""
+    image = image.copy()
+    for i, ((x_min, y_min, x_max, y_max), class_id) in enumerate(
+            zip(coords.tolist(), classes.tolist()), start=1):
+        if class_id < 0:
+            # layout spot with no reading yet
+            cv2.rectangle(image, (x_min, y_min),
+                          (x_max, y_max), (128, 128, 128), 1)
+            continue
+
+        cv2.rectangle(image, (x_min, y_min),
+                      (x_max, y_max), (0, 255, 0), 2)
+        cv2.putText(image, str(i), (x_min, y_min - 8),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 0), 2)
+    return image
+
+
+def write_image(output_path, image, params=None):
+    folder = os.path.dirname(output_path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    cv2.imwrite(output_path, image, params or [])
+    return output_path
+
+
+class LotSnapshot:
+    """
+    One scan's frame + spot columns, rendered only when asked for.
+    Safe to hand to a background thread: later scans publish new arrays
+    instead of changing these.
+    """
+
+    def __init__(self, image, coords, classes):
+        self.image = image
+        self.coords = coords
+        self.classes = classes
+        self._rendered = None
+
+    def render(self):
+        if self._rendered is None:
+            self._rendered = draw_spots(self.image, self.coords, self.classes)
+        return self._rendered
+
+    def save(self, output_path, params=None):
+        return write_image(output_path, self.render(), params)
 
 
 class ParkingSpotAnalyzer:
@@ -9,20 +112,41 @@ class ParkingSpotAnalyzer:
     - Sorts detected spots (top→bottom, left→right)
     - Assigns spot numbers
     - Determines empty vs parked
-    - Annotates the image
+    - Annotates the image (only when it is asked for)
     - Allows saving and displaying separately
+
+    analyze() touches no pixels; the annotated frame is drawn lazily by
+    render(), save(), show() or last_annotated_image.
+
+    Calibrated layout mode: once the spot boxes are known (calibrate() or
+    load_layout()), spot numbers come from the layout instead of being
+    re-derived every scan, and occupancy can be read by classifying only
+    the fixed spot crops (spot_crops() + classify_spots()).
     """
 
-    def __init__(self, class_list=None):
+    def __init__(self, class_list=None, min_iou=0.3, crop_margin=0.15):
         self.original_image = None
-        self.last_annotated_image = None
+        self._snapshot = None
 
         self.class_list = class_list if class_list else ["car", "free"]
 
-        self.all_spots = []
+        # Spots of the last scan as columns, in spot-number order:
+        # coords (N, 4) int32, class ids (N,) int32 with -1 = no reading yet,
+        # confidences (N,) float32. get_all_spots() builds dicts on demand.
+        self.spot_coords = np.zeros((0, 4), dtype=np.int32)
+        self.spot_classes = np.zeros(0, dtype=np.int32)
+        self.spot_confidences = np.zeros(0, dtype=np.float32)
+        self._spot_dicts = []
+
         self.empty_spot_numbers = []
         self.parked_spot_numbers = []
 
+        # calibrated layout: fixed spot boxes, spot number = index + 1
+        self.layout = None
+        self.spot_index = None
+        self.min_iou = min_iou
+        self.crop_margin = crop_margin
+
     # ------------------------------------------------------------
     # IMAGE LOADING
     # ------------------------------------------------------------
@@ -39,9 +163,14 @@ class ParkingSpotAnalyzer:
         return image
 
     def add_image_direct(self, image):
+        """
+        Use a decoded frame as-is (no copy). Rendering always draws on a
+        copy, so the frame is never modified, but the caller must not
+        reuse its buffer for the next frame.
+        """
         if image is None or not hasattr(image, "shape"):
             raise ValueError("Invalid OpenCV image provided.")
-        self.original_image = image.copy()
+        self.original_image = image
 
     # ------------------------------------------------------------
     # SORTING
@@ -51,81 +180,214 @@ class ParkingSpotAnalyzer:
         if not spots:
             return []
 
-        spots = sorted(spots, key=lambda s: s["coords"][1])
-        heights = [s["coords"][3] - s["coords"][1] for s in spots]
-        avg_height = sum(heights) / len(heights)
-        row_threshold = avg_height * 0.6
-
-        rows = []
-        for spot in spots:
-            y_min = spot["coords"][1]
-            placed = False
-
-            for row in rows:
-                if abs(y_min - row[0]["coords"][1]) < row_threshold:
-                    row.append(spot)
-                    placed = True
-                    break
-
-            if not placed:
-                rows.append([spot])
-
-        sorted_spots = []
-        for row in rows:
-            sorted_spots.extend(sorted(row, key=lambda s: s["coords"][0]))
-
-        return sorted_spots
+        order = row_major_order([s["coords"] for s in spots])
+        return [spots[i] for i in order]
 
     # ------------------------------------------------------------
     # ANNOTATION
     # ------------------------------------------------------------
 
-    def annotate_image(self, results):
+    def _extract_detections(self, results):
+        """
+        (coords, class ids, confidences) arrays for all boxes in `results`,
+        with one device -> host copy per result (boxes.data is the
+        [x1, y1, x2, y2, conf, cls] tensor).
+        """
+        blocks = [result.boxes.data.cpu().numpy().reshape(-1, 6) for result in results]
+        data = np.concatenate(blocks) if blocks else np.zeros((0, 6), np.float32)
+
+        return (data[:, :4].astype(np.int32),
+                data[:, 5].astype(np.int32),
+                data[:, 4].astype(np.float32))
+
+    def _publish(self, coords, classes, confidences):
+        """Swap in the new columns and spot lists in one go."""
         if self.original_image is None:
             raise ValueError(
                 "No image loaded. Use add_image() or add_image_direct().")
 
-        self.all_spots.clear()
-        self.empty_spot_numbers.clear()
-        self.parked_spot_numbers.clear()
-
-        image = self.original_image.copy()
+        # Build fresh lists and publish them at the end, so readers of the
+        # previous scan never see a half-filled state
+        free_id = self.class_list.index("free") if "free" in self.class_list else -2
+        numbers = np.arange(1, len(coords) + 1)
+        empty_spot_numbers = numbers[classes == free_id].tolist()
+        parked_spot_numbers = numbers[(classes >= 0) & (classes != free_id)].tolist()
+
+        self.spot_coords = coords
+        self.spot_classes = classes
+        self.spot_confidences = confidences
+        self._spot_dicts = None
+        self.empty_spot_numbers = empty_spot_numbers
+        self.parked_spot_numbers = parked_spot_numbers
+        self._snapshot = LotSnapshot(self.original_image, coords, classes)
+        return self.get_parking_summary()
+
+    def analyze(self, results):
+        """Occupancy from YOLO results, without drawing. Returns the summary."""
+        if self.original_image is None:
+            raise ValueError(
+                "No image loaded. Use add_image() or add_image_direct().")
 
         # Extract YOLO detections
-        for result in results:
-            for box, conf, class_id in zip(
-                result.boxes.xyxy,
-                result.boxes.conf,
-                result.boxes.cls
-            ):
-                x_min, y_min, x_max, y_max = map(int, box)
-
-                self.all_spots.append({
-                    "coords": (x_min, y_min, x_max, y_max),
-                    "class_id": int(class_id),
-                    "confidence": float(conf)
-                })
-
-        self.all_spots = self.sort_spots_top_to_bottom_left_to_right(
-            self.all_spots)
-
-        # Draw annotation
-        for i, spot in enumerate(self.all_spots, start=1):
-            x_min, y_min, x_max, y_max = spot["coords"]
-            class_name = self.class_list[spot["class_id"]]
+        coords, classes, confidences = self._extract_detections(results)
 
-            cv2.rectangle(image, (x_min, y_min),
-                          (x_max, y_max), (0, 255, 0), 2)
-            cv2.putText(image, str(i), (x_min, y_min - 8),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 0), 2)
+        if self.layout is not None:
+            return self._publish(*self._match_to_layout(coords, classes, confidences))
 
-            if class_name == "free":
-                self.empty_spot_numbers.append(i)
-            else:
-                self.parked_spot_numbers.append(i)
+        order = row_major_order(coords)
+        return self._publish(coords[order], classes[order], confidences[order])
 
-        self.last_annotated_image = image
-        return image
+    def annotate_image(self, results):
+        """analyze() + render(): returns the annotated image."""
+        self.analyze(results)
+        return self.render()
+
+    def snapshot(self):
+        """The last scan as a LotSnapshot (None before the first scan)."""
+        return self._snapshot
+
+    def render(self):
+        if self._snapshot is None:
+            raise ValueError("No annotated image. Run analyze() first.")
+        return self._snapshot.render()
+
+    @property
+    def last_annotated_image(self):
+        return self._snapshot.render() if self._snapshot is not None else None
+
+    # ------------------------------------------------------------
+    # CALIBRATED LAYOUT
+    # ------------------------------------------------------------
+
+    def _layout_state(self):
+        """Layout columns carrying the last known state of each spot."""
+        coords = np.asarray(self.layout, dtype=np.int32).reshape(-1, 4)
+        if len(self.spot_classes) == len(coords):
+            return coords, self.spot_classes.copy(), self.spot_confidences.copy()
+        return (coords, np.full(len(coords), -1, dtype=np.int32),
+                np.zeros(len(coords), dtype=np.float32))
+
+    def _match_to_layout(self, det_coords, det_classes, det_confidences):
+        """
+        Give every layout spot the detection that overlaps it most.
+        Spots without a match keep their last state, so a missed detection
+        no longer shifts the numbering.
+        """
+        coords, classes, confidences = self._layout_state()
+        if len(det_coords) == 0:
+            return coords, classes, confidences
+
+        best = self.spot_index.match(det_coords, self.min_iou)
+        hit = best >= 0
+        classes[hit] = det_classes[best[hit]]
+        confidences[hit] = det_confidences[best[hit]]
+        return coords, classes, confidences
+
+    def _set_layout(self, coords):
+        self.layout = [tuple(int(v) for v in c) for c in coords]
+        self.spot_index = SpotIndex(self.layout)
+        return self.layout
+
+    def calibrate(self, spots=None):
+        """
+        Freeze the spot boxes of the last scan (or the given spot dicts /
+        coords) as the lot layout. Spot numbers keep their current order.
+        """
+        if spots is None:
+            spots = self.spot_coords.tolist()
+        if len(spots) == 0:
+            raise ValueError("No spots to calibrate from. Run annotate_image() first.")
+
+        return self._set_layout(
+            [s["coords"] if isinstance(s, dict) else s for s in spots])
+
+    def clear_layout(self):
+        self.layout = None
+        self.spot_index = None
+
+    def save_layout(self, path):
+        if self.layout is None:
+            raise ValueError("No layout. Run calibrate() or load_layout() first.")
+
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+
+        data = {
+            "class_list": self.class_list,
+            "spots": [{"spot": i, "coords": list(coords)}
+                      for i, coords in enumerate(self.layout, start=1)],
+        }
+        with open(path, "w") as f:
+            json.dump(data, f, indent=2)
+        return path
+
+    def load_layout(self, path):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Layout file does not exist: {path}")
+
+        with open(path) as f:
+            data = json.load(f)
+
+        spots = sorted(data.get("spots", []), key=lambda s: s["spot"])
+        if not spots or any(len(s["coords"]) != 4 for s in spots):
+            raise ValueError(f"Invalid layout file: {path}")
+
+        self.spot_classes = np.zeros(0, dtype=np.int32)
+        return self._set_layout([s["coords"] for s in spots])
+
+    def _crop_box(self, coords, shape):
+        """Spot box grown by crop_margin (context helps the detector)."""
+        x_min, y_min, x_max, y_max = coords
+        pad_x = int((x_max - x_min) * self.crop_margin)
+        pad_y = int((y_max - y_min) * self.crop_margin)
+        h, w = shape[:2]
+        return (max(0, x_min - pad_x), max(0, y_min - pad_y),
+                min(w, x_max + pad_x), min(h, y_max + pad_y))
+
+    def spot_crops(self, image, indexes=None):
+        """
+        Crops of the layout spots (all, or only `indexes`), ready for a
+        batched APSD.predict_batch. Crops are views, not copies.
+        """
+        if self.layout is None:
+            raise ValueError("No layout. Run calibrate() or load_layout() first.")
+
+        indexes = range(len(self.layout)) if indexes is None else indexes
+        crops = []
+        for i in indexes:
+            x1, y1, x2, y2 = self._crop_box(self.layout[i], image.shape)
+            crops.append(image[y1:y2, x1:x2])
+        return crops
+
+    def classify_spots(self, crop_results, indexes=None):
+        """
+        Update layout spots from per-crop YOLO results (one result per crop,
+        same order as spot_crops). Spots not in `indexes` keep their state.
+        Returns the summary; like analyze(), nothing is drawn.
+        """
+        if self.layout is None:
+            raise ValueError("No layout. Run calibrate() or load_layout() first.")
+
+        indexes = list(range(len(self.layout))) if indexes is None else list(indexes)
+        coords, classes, confidences = self._layout_state()
+
+        for i, result in zip(indexes, crop_results):
+            det_coords, det_classes, det_confidences = self._extract_detections([result])
+            if len(det_coords) == 0:
+                continue
+
+            # spot box in crop coordinates
+            cx, cy = self._crop_box(self.layout[i], self.original_image.shape)[:2]
+            target = coords[i] - (cx, cy, cx, cy)
+
+            ious = iou_matrix(target, det_coords)[0]
+            best = int(ious.argmax())
+            if ious[best] >= self.min_iou:
+                classes[i] = det_classes[best]
+                confidences[i] = det_confidences[best]
+
+        return self._publish(coords, classes, confidences)
 
     # ------------------------------------------------------------
     # GETTERS
@@ -138,11 +400,38 @@ class ParkingSpotAnalyzer:
         return self.parked_spot_numbers
 
     def get_all_spots(self):
-        return self.all_spots
+        """Spots as dicts (coords, class_id, confidence), built on demand."""
+        spots = self._spot_dicts
+        if spots is None:
+            spots = [
+                {
+                    "coords": tuple(coords),
+                    "class_id": class_id if class_id >= 0 else None,
+                    "confidence": confidence,
+                }
+                for coords, class_id, confidence in zip(
+                    self.spot_coords.tolist(),
+                    self.spot_classes.tolist(),
+                    self.spot_confidences.tolist())
+            ]
+            self._spot_dicts = spots
+        return spots
+
+    all_spots = property(get_all_spots)
+
+    def get_occupancy(self):
+        """
+        (occupancy, confidences) per spot number: 1 occupied, 0 free,
+        -1 no reading yet. Input for SpotTracker.update().
+        """
+        free_id = self.class_list.index("free") if "free" in self.class_list else -2
+        occupancy = np.where(self.spot_classes == free_id, 0, 1).astype(np.int8)
+        occupancy[self.spot_classes < 0] = -1
+        return occupancy, self.spot_confidences
 
     def get_parking_summary(self):
         return {
-            "total_spots": len(self.all_spots),
+            "total_spots": len(self.spot_coords),
             "parked_count": len(self.parked_spot_numbers),
             "empty_count": len(self.empty_spot_numbers),
             "empty_spots": self.empty_spot_numbers.copy(),
@@ -153,13 +442,18 @@ class ParkingSpotAnalyzer:
     # SAVE + SHOW 
     # ------------------------------------------------------------
 
-    def save(self, output_path="annotated.jpg"):
-        """Save only – no display."""
-        if self.last_annotated_image is None:
+    def save(self, output_path="annotated.jpg", image=None, params=None):
+        """
+        Save only – no display.
+        Pass `image` to save a specific annotated frame (e.g. one captured
+        earlier and written from a background thread), `params` for extra
+        cv2.imwrite flags such as JPEG quality.
+        """
+        image = self.last_annotated_image if image is None else image
+        if image is None:
             raise ValueError("No annotated image. Run annotate_image() first.")
 
-        cv2.imwrite(output_path, self.last_annotated_image)
-        return output_path
+        return write_image(output_path, image, params)
 
     def show(self, resize_dim=(900, 900)):
         """Show only – no file saving."""
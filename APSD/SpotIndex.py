@@ -0,0 +1,122 @@
+import numpy as np
+
+
+class SpotIndex:
+    """
+    Uniform grid over a fixed set of spot boxes (xyxy), for matching
+    detection boxes to spots without comparing every pair.
+
+    Each spot is registered in every grid cell its box touches. A query box
+    only meets the spots that share a cell with it, so the IoU work grows
+    with the number of real overlaps instead of spots x detections. Lookups
+    are done with sorted cell keys + searchsorted, with no Python loop over
+    boxes and no sort of the candidate pairs.
+    """
+
+    def __init__(self, boxes, cell_size=None):
+        self.boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+
+        if cell_size is None and len(self.boxes):
+            # about one spot per cell
+            sizes = self.boxes[:, 2:] - self.boxes[:, :2]
+            cell_size = float(max(np.median(sizes), 1.0))
+        self.cell_size = cell_size or 1.0
+
+        if len(self.boxes):
+            self.origin = self.boxes[:, :2].min(axis=0)
+            extent = self.boxes[:, 2:].max(axis=0) - self.origin
+            self.cols = int(extent[0] // self.cell_size) + 1
+            self.rows = int(extent[1] // self.cell_size) + 1
+        else:
+            self.origin = np.zeros(2, dtype=np.float32)
+            self.cols = self.rows = 1
+
+        spot_ids, keys = self._cells(self.boxes)
+        order = np.argsort(keys, kind="stable")
+        self.cell_keys = keys[order]
+        self.cell_spots = spot_ids[order]
+
+    def __len__(self):
+        return len(self.boxes)
+
+    # ------------------------------------------------------------
+    # HELPERS
+    # ------------------------------------------------------------
+
+    def _cells(self, boxes):
+        """(box index, cell key) for every cell each box touches."""
+        if len(boxes) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+        first = np.floor((boxes[:, :2] - self.origin) / self.cell_size).astype(np.int64)
+        last = np.floor((boxes[:, 2:] - self.origin) / self.cell_size).astype(np.int64)
+        first[:, 0] = np.clip(first[:, 0], 0, self.cols - 1)
+        last[:, 0] = np.clip(last[:, 0], 0, self.cols - 1)
+        first[:, 1] = np.clip(first[:, 1], 0, self.rows - 1)
+        last[:, 1] = np.clip(last[:, 1], 0, self.rows - 1)
+
+        widths = last[:, 0] - first[:, 0] + 1
+        counts = widths * (last[:, 1] - first[:, 1] + 1)
+
+        box_ids = np.repeat(np.arange(len(boxes)), counts)
+        local = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        cx = first[box_ids, 0] + local % widths[box_ids]
+        cy = first[box_ids, 1] + local // widths[box_ids]
+        return box_ids, cy * self.cols + cx
+
+    # ------------------------------------------------------------
+    # PUBLIC API
+    # ------------------------------------------------------------
+
+    def ious(self, boxes):
+        """
+        (query index, spot index, IoU) for every query box / spot pair that
+        overlaps, each pair once.
+        """
+        boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+        query_ids, keys = self._cells(boxes)
+
+        lo = np.searchsorted(self.cell_keys, keys, "left")
+        hi = np.searchsorted(self.cell_keys, keys, "right")
+        counts = hi - lo
+
+        query = np.repeat(query_ids, counts)
+        cell = np.repeat(keys, counts)
+        local = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        spots = self.cell_spots[np.repeat(lo, counts) + local]
+
+        a, b = boxes[query], self.boxes[spots]
+        x1 = np.maximum(a[:, 0], b[:, 0])
+        y1 = np.maximum(a[:, 1], b[:, 1])
+        w = np.minimum(a[:, 2], b[:, 2]) - x1
+        h = np.minimum(a[:, 3], b[:, 3]) - y1
+
+        # A pair that overlaps meets in every cell its intersection touches;
+        # keep it only in the cell holding the intersection's top-left corner.
+        cx = np.clip(((x1 - self.origin[0]) // self.cell_size).astype(np.int64), 0, self.cols - 1)
+        cy = np.clip(((y1 - self.origin[1]) // self.cell_size).astype(np.int64), 0, self.rows - 1)
+        keep = (w > 0) & (h > 0) & (cy * self.cols + cx == cell)
+
+        query, spots, a, b = query[keep], spots[keep], a[keep], b[keep]
+        inter = w[keep] * h[keep]
+        area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+        area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+        return query, spots, inter / (area_a + area_b - inter)
+
+    def match(self, boxes, min_iou=0.3):
+        """
+        Best query box for every spot: array of query indexes (-1 = no box
+        reaches min_iou). Ties go to the lowest query index.
+        """
+        best = np.full(len(self.boxes), -1, dtype=np.int64)
+        query, spots, iou = self.ious(boxes)
+        keep = iou >= min_iou
+        if not keep.any():
+            return best
+
+        query, spots, iou = query[keep], spots[keep], iou[keep]
+        order = np.lexsort((query, -iou, spots))
+        spots, query = spots[order], query[order]
+        first = np.r_[True, spots[1:] != spots[:-1]]
+        best[spots[first]] = query[first]
+        return best
@@ -0,0 +1,106 @@
+import numpy as np
+
+
+class SpotTracker:
+    """
+    Debounced occupied/free state per spot number, over the last `window`
+    scans of one camera.
+
+    Every scan adds one reading per spot, weighted by its detection
+    confidence. The occupancy score is the weighted share of "occupied"
+    readings in the window; a free spot becomes occupied when the score
+    reaches `enter_threshold` and an occupied spot becomes free when it
+    falls to `exit_threshold`. The gap between the two stops a flickering
+    detection from toggling the spot back and forth.
+
+    update() returns the state changes of that scan as events, any number
+    at once. The first readings of a spot only set its state, no events.
+    All spots are updated together with array ops (ring buffer per spot).
+    """
+
+    def __init__(self, window=3, enter_threshold=0.6, exit_threshold=0.4,
+                 min_confidence=0.0):
+        if not 0.0 <= exit_threshold < enter_threshold <= 1.0:
+            raise ValueError("Need 0 <= exit_threshold < enter_threshold <= 1")
+
+        self.window = max(1, int(window))
+        self.enter_threshold = enter_threshold
+        self.exit_threshold = exit_threshold
+        self.min_confidence = min_confidence
+
+        self.readings = np.zeros((0, self.window), dtype=np.float32)
+        self.weights = np.zeros((0, self.window), dtype=np.float32)
+        self.states = np.zeros(0, dtype=np.int8)   # 1 occupied, 0 free, -1 unknown
+        self.position = 0
+
+    def _resize(self, count):
+        """Keep history for spot numbers that still exist, add new ones."""
+        current = len(self.states)
+        if count == current:
+            return
+        if count < current:
+            self.readings = self.readings[:count]
+            self.weights = self.weights[:count]
+            self.states = self.states[:count]
+            return
+
+        extra = count - current
+        self.readings = np.vstack([self.readings, np.zeros((extra, self.window), np.float32)])
+        self.weights = np.vstack([self.weights, np.zeros((extra, self.window), np.float32)])
+        self.states = np.concatenate([self.states, np.full(extra, -1, np.int8)])
+
+    # ------------------------------------------------------------
+    # PUBLIC API
+    # ------------------------------------------------------------
+
+    def update(self, occupancy, confidences=None):
+        """
+        `occupancy` has one entry per spot number (index 0 = spot 1):
+        1 occupied, 0 free, -1 no reading. Returns
+        [{"spot": n, "event": "arrived" | "left", "score": s}, ...].
+        """
+        occupancy = np.asarray(occupancy, dtype=np.int8)
+        if confidences is None:
+            confidences = np.ones(len(occupancy), dtype=np.float32)
+        confidences = np.asarray(confidences, dtype=np.float32)
+
+        self._resize(len(occupancy))
+        if len(occupancy) == 0:
+            return []
+
+        # readings without a class or under min_confidence count as absent
+        seen = (occupancy >= 0) & (confidences >= self.min_confidence)
+        slot = self.position
+        self.readings[:, slot] = occupancy == 1
+        self.weights[:, slot] = np.where(seen, np.maximum(confidences, 1e-3), 0.0)
+        self.position = (slot + 1) % self.window
+
+        total = self.weights.sum(axis=1)
+        known = total > 0
+        score = np.divide((self.readings * self.weights).sum(axis=1), total,
+                          out=np.zeros_like(total), where=known)
+
+        previous = self.states.copy()
+        states = self.states
+        states[known & (previous == -1)] = (score >= 0.5)[known & (previous == -1)]
+        states[known & (previous == 0) & (score >= self.enter_threshold)] = 1
+        states[known & (previous == 1) & (score <= self.exit_threshold)] = 0
+
+        arrived = np.flatnonzero((previous == 0) & (states == 1))
+        left = np.flatnonzero((previous == 1) & (states == 0))
+
+        events = [{"spot": int(i) + 1, "event": "arrived", "score": round(float(score[i]), 3)}
+                  for i in arrived]
+        events += [{"spot": int(i) + 1, "event": "left", "score": round(float(score[i]), 3)}
+                   for i in left]
+        return events
+
+    def occupied_spots(self):
+        return (np.flatnonzero(self.states == 1) + 1).tolist()
+
+    def free_spots(self):
+        return (np.flatnonzero(self.states == 0) + 1).tolist()
+
+    def reset(self):
+        self._resize(0)
+        self.position = 0
@@ -0,0 +1,118 @@
+# ModelRegistry.py
+
+import os
+import threading
+import time
+
+from ANPR.ANPR import ANPR
+from ANPR.PlateCache import PlateCache
+from APSD.APSD import APSD
+
+
+class ModelRegistry:
+    """
+    One copy of each model per process, shared by every ParkingSystem.
+
+    get_anpr()/get_apsd() return cheap wrappers right away; the weights are
+    loaded on first use, or ahead of time by warm_up(), which loads every
+    registered model and runs one inference on a blank input, optionally in
+    a background thread. status()/is_ready() report progress for /health.
+
+    Models belong to the registry: close() shuts them down (OCR workers).
+    """
+
+    _default = None
+    _default_lock = threading.Lock()
+
+    @classmethod
+    def default(cls):
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.models = {}   # key -> ANPR / APSD
+        self.states = {}   # key -> {"state", "seconds", "error"}
+        self.thread = None
+
+    def _register(self, key, factory):
+        with self.lock:
+            model = self.models.get(key)
+            if model is None:
+                model = factory()
+                self.models[key] = model
+                self.states[key] = {"state": "pending", "seconds": None, "error": None}
+            return model
+
+    # ------------------------------------------------------------
+    # MODELS
+    # ------------------------------------------------------------
+
+    def get_anpr(self, ocr_workers=0, localizer="full"):
+        # repeated gate frames are answered from the cache, without OCR
+        return self._register(
+            f"anpr:{ocr_workers}:{localizer}",
+            lambda: ANPR(ocr_workers=ocr_workers, localizer=localizer,
+                         cache=PlateCache()))
+
+    def get_apsd(self, model_path="./APSD/apsd.pt"):
+        return self._register(
+            f"apsd:{os.path.abspath(model_path)}", lambda: APSD(model_path))
+
+    # ------------------------------------------------------------
+    # WARM-UP + READINESS
+    # ------------------------------------------------------------
+
+    def _warm_up_all(self):
+        with self.lock:
+            pending = [key for key, s in self.states.items() if s["state"] != "ready"]
+
+        for key in pending:
+            self.states[key] = {"state": "loading", "seconds": None, "error": None}
+            started = time.perf_counter()
+            try:
+                self.models[key].warm_up()
+            except Exception as e:
+                print(f"[WARN] Warm-up failed for {key}: {e}")
+                self.states[key] = {"state": "failed", "seconds": None, "error": str(e)}
+                continue
+            self.states[key] = {
+                "state": "ready",
+                "seconds": round(time.perf_counter() - started, 3),
+                "error": None,
+            }
+
+    def warm_up(self, background=False):
+        """
+        Load and warm every registered model. With background=True this
+        returns at once and the models load in a daemon thread.
+        """
+        if not background:
+            self._warm_up_all()
+            return None
+
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(
+                    target=self._warm_up_all, daemon=True, name="model-warm-up")
+                self.thread.start()
+            return self.thread
+
+    def status(self):
+        with self.lock:
+            return {key: dict(state) for key, state in self.states.items()}
+
+    def is_ready(self):
+        return all(
+            s["state"] == "ready" or self.models[key].is_loaded()
+            for key, s in self.status().items()
+        )
+
+    def close(self):
+        with self.lock:
+            models = list(self.models.values())
+        for model in models:
+            if isinstance(model, ANPR):
+                model.close()
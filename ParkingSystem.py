@@ -1,29 +1,100 @@
 import os
-from ANPR.ANPR import ANPR
-from APSD.APSD import APSD
-from tinydb import TinyDB, Query
+import functools
+import threading
+from APSD.ChangeDetector import ChangeDetector
 from APSD.ParkingSpotAnalyzer import ParkingSpotAnalyzer
+from APSD.SpotTracker import SpotTracker
+from ModelRegistry import ModelRegistry
+from SpotAssigner import SpotAssigner
+from storage.JsonBackend import JsonBackend
+from storage.LogBackend import LogBackend
+from storage.SessionStore import SessionStore
+from storage.SqliteBackend import SqliteBackend, SqliteSessionStore
+from utils.ArtifactWriter import ArtifactWriter
+from utils.RetentionPolicy import RetentionPolicy
+from utils.PlateIndex import PlateIndex, normalize_plate
 from utils.index import now, slug_plate
 
+DEFAULT_CAMERA = "default"
+
+# storage="..." -> backend class
+STORAGE_BACKENDS = {
+    "json": JsonBackend,
+    "log": LogBackend,
+    "sqlite": SqliteBackend,
+}
+SQLITE_EXTENSIONS = (".db", ".sqlite", ".sqlite3")
+
+
+def with_db_lock(method):
+    """Run a ParkingSystem method while holding its db_lock."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.db_lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
 
 class ParkingSystem:
-    def __init__(self, apsd_model="./APSD/apsd.pt", db_path="parking_sessions.json"):
-        self.anpr = ANPR()
-        self.apsd = APSD(apsd_model)
+    def __init__(self, apsd_model="./APSD/apsd.pt", db_path="parking_sessions.json",
+                 storage=None, artifact_workers=1, artifact_queue=64,
+                 artifact_policy="drop_oldest", retention=None, ocr_workers=0,
+                 change_gating=True, spot_window=1, spot_assigner=None,
+                 registry=None, plate_localizer="full", fuzzy_max_distance=1,
+                 fold_allowed_plates=False):
+        # models are shared through the registry and load on first use
+        # (or earlier via warm_up()), so construction is cheap
+        self.registry = registry or ModelRegistry.default()
+        self.anpr = self.registry.get_anpr(ocr_workers, plate_localizer)
+        self.apsd = self.registry.get_apsd(apsd_model)
         self.analyzer = ParkingSpotAnalyzer()
+        self.lot_analyzers = {DEFAULT_CAMERA: self.analyzer}
 
-        self.db_path = db_path
-        self.db = TinyDB(db_path)
+        # skip YOLO on lot frames where no spot changed since the last run
+        self.change_gating = change_gating
+        self.change_detectors = {}
+        self.last_summaries = {}
+
+        # Plate reads and YOLO inference run outside these locks, so entry
+        # and exit gates are served concurrently. db_lock only covers the
+        # short storage sections, lot_locks keep one scan per camera.
+        self.db_lock = threading.RLock()
+        self.lot_locks = {}
+        self.lot_locks_guard = threading.Lock()
+
+        # debug images are written off the request path
+        self.artifact_writer = ArtifactWriter(
+            workers=artifact_workers, max_queue=artifact_queue,
+            policy=artifact_policy)
 
-        self.sessions = self.db.table("sessions")
-        self.allowed = self.db.table("allowed_cars")
-        self.meta = self.db.table("meta")
+        # which debug images each stage keeps: {"anpr": ..., "apsd": ...}
+        self.retention = {"anpr": RetentionPolicy(), "apsd": RetentionPolicy()}
+        self.retention.update(retention or {})
 
-        self.previous_empty_spots = None
+        self.db_path = db_path
+        self.backend = self._open_backend(db_path, storage)
+        if isinstance(self.backend, SqliteBackend):
+            self.session_store = SqliteSessionStore(self.backend)
+        else:
+            self.session_store = SessionStore(self.backend)
+
+        # debounced spot states per camera; spot_window=1 follows every
+        # scan, 3-5 smooths flickering detections on continuous streams
+        self.spot_window = spot_window
+        self.spot_windows = {}   # camera_id -> window, overrides spot_window
+        self.spot_trackers = {}
+        self.spot_assigner = spot_assigner or SpotAssigner()
         self.security_enabled = True
+        # exit reads this many edits away from an open session's plate
+        # still close it (0 = only O/0, B/8 ... confusions)
+        self.fuzzy_max_distance = fuzzy_max_distance
+        # gate also admits plates equal to an allowed one once O/0, B/8 ...
+        # are folded; off by default since that admits different plates too
+        self.fold_allowed_plates = fold_allowed_plates
 
-        self.next_session_id = self._get_next_session_id()
         self.next_scan_id = self._get_next_scan_id()
+        self._load_allowed()
+        self._synced_stamp = self._db_stamp()
 
     # ------------------------------------------------------------------
     # SECURITY TOGGLE METHODS
@@ -48,57 +119,78 @@ class ParkingSystem:
     # UTIL: session
     # ------------------------------------------------------------------
 
-    def _get_next_session_id(self):
-        if len(self.sessions) == 0:
-            return 1
-        return max(row["session_id"] for row in self.sessions.all()) + 1
-
     def _get_next_scan_id(self):
-        Meta = Query()
-        row = self.meta.get(Meta.key == "scan_counter")
-        if row and "value" in row:
-            return row["value"]
+        self._scan_counter_doc_id = None
+        for doc_id, row in self.backend.load("meta"):
+            if row.get("key") == "scan_counter":
+                self._scan_counter_doc_id = doc_id
+                return row.get("value", 1)
         return 1
 
+    @with_db_lock
     def _bump_scan_id(self):
-        Meta = Query()
         current = self.next_scan_id
         self.next_scan_id += 1
-        self.meta.upsert(
-            {"key": "scan_counter", "value": self.next_scan_id},
-            Meta.key == "scan_counter"
-        )
+
+        if self._scan_counter_doc_id is None:
+            self._scan_counter_doc_id = self.backend.insert(
+                "meta", {"key": "scan_counter", "value": self.next_scan_id})
+        else:
+            self.backend.update(
+                "meta", self._scan_counter_doc_id, {"value": self.next_scan_id})
+
+        self._mark_synced()
         return current
 
     def _latest_session(self, plate):
-        Car = Query()
-        rows = self.sessions.search(Car.plate == plate)
-        if not rows:
-            return None
-        return sorted(rows, key=lambda r: r["session_id"], reverse=True)[0]
+        return self.session_store.latest(plate)
+
+    def _match_active_plate(self, plate):
+        """
+        The plate of an open session when `plate` has never had a session:
+        the single closest open plate within fuzzy_max_distance edits (after
+        folding O/0, B/8, I/1 ...), else `plate` itself. A plate that has
+        already exited stays as read, so a retried exit can't close
+        another car's session.
+        """
+        if not plate or self.session_store.latest(plate) is not None:
+            return plate
+        match = self.session_store.closest_active(plate, self.fuzzy_max_distance)
+        return match[0] if match else plate
 
     # ------------------------------------------------------------------
     # EVENT 1: ENTRY
     # ------------------------------------------------------------------
 
-    def handle_entry(self, gate_image_path):
-        plate_raw = self.anpr.detect(gate_image_path)
+    def handle_entry(self, gate_image, zone=None):
+        """
+        `gate_image` is a path, encoded image bytes or a numpy array, or a
+        list of them (a burst of the same car, read with voting).
+        `zone` (optional) limits spot assignment to that zone's cameras.
+        """
+        read = self._read_plate(gate_image)
+        return self._record_entry(read, zone)
+
+    def _read_plate(self, image):
+        if isinstance(image, (list, tuple)):
+            return self.anpr.read_burst(image)
+        return self.anpr.read(image)
+
+    @with_db_lock
+    def _record_entry(self, read, zone=None):
+        self.refresh_db()
+        plate_raw = read.text
         plate = slug_plate(plate_raw)
+        denied = self.security_enabled and not self.is_allowed(plate)
 
-        # Save
-        try:
-            folder = "./output/anpr/entry"
-            os.makedirs(folder, exist_ok=True)
-            prefix = f"entry_scan_{self._bump_scan_id()}"
-            self.anpr.save(folder=folder, prefix=prefix)
-        except Exception as e:
-            print(f"[WARN] Failed to save ANPR entry images: {e}")
-
-        Car = Query()
+        # Save (in the background)
+        self._save_anpr_outputs(
+            read, "./output/anpr/entry", "entry_scan",
+            failed=denied or plate_raw == "N/A")
 
         # 🚨 SECURITY CHECK
         if self.security_enabled:
-            if not self.is_allowed(plate):
+            if denied:
                 return {
                     "error": "ACCESS DENIED",
                     "message": "Car is not on the allowed list",
@@ -106,9 +198,7 @@ class ParkingSystem:
                 }
 
         # Prevent duplicate entry
-        active_session = self.sessions.get(
-            (Car.plate == plate) & (Car.status != "exited")
-        )
+        active_session = self.session_store.active(plate)
 
         if active_session:
             return {
@@ -118,19 +208,20 @@ class ParkingSystem:
                 "status": active_session["status"]
             }
 
-        # Create new session
-        session_id = self.next_session_id
-        self.next_session_id += 1
-
-        self.sessions.insert({
-            "session_id": session_id,
+        # Create new session (id is allocated by the store)
+        session = {
+            "session_id": None,
             "plate": plate,
             "status": "entering",
             "spot": None,
             "entry_time": now(),
             "park_time": None,
             "exit_time": None
-        })
+        }
+        if zone:
+            session["zone"] = zone
+        self.session_store.insert(session)
+        self._mark_synced()
 
         return plate
 
@@ -138,152 +229,482 @@ class ParkingSystem:
     # EVENT 2: PARKING LOT SCAN
     # ------------------------------------------------------------------
 
-    def scan_parking_lot(self, lot_image):
-        results = self.apsd.predict(lot_image)
-        self.analyzer.add_image_direct(lot_image)
-        self.analyzer.annotate_image(results)
-
-        # save with persistent scan index
-        OUTPUT_FOLDER = "./output/apsd/"
-        os.makedirs(OUTPUT_FOLDER, exist_ok=True)
+    def scan_parking_lot(self, lot_image, camera_id=DEFAULT_CAMERA):
+        cached, dirty = self._check_lot_frame(camera_id, lot_image)
+        if cached is not None:
+            return cached
+
+        analyzer = self._get_lot_analyzer(camera_id)
+        if analyzer.layout is not None:
+            # calibrated lot: classify only the (changed) spot crops
+            results = self.apsd.predict_batch(analyzer.spot_crops(lot_image, dirty))
+        else:
+            results = self.apsd.predict(lot_image)
+        return self._process_lot_scan(camera_id, lot_image, results, dirty)
+
+    def scan_parking_lots(self, frames_by_camera):
+        """
+        Scan several lot cameras with a single batched inference call.
+        Returns {camera_id: summary}.
+        """
+        summaries = {}
+        pending = []   # (camera_id, frame, dirty, first crop, crop count)
+        inputs = []
+
+        for camera_id, frame in frames_by_camera.items():
+            cached, dirty = self._check_lot_frame(camera_id, frame)
+            if cached is not None:
+                summaries[camera_id] = cached
+                continue
+
+            analyzer = self._get_lot_analyzer(camera_id)
+            if analyzer.layout is not None:
+                crops = analyzer.spot_crops(frame, dirty)
+            else:
+                crops = [frame]
+            pending.append((camera_id, frame, dirty, len(inputs), len(crops)))
+            inputs.extend(crops)
+
+        results = self.apsd.predict_batch(inputs)
+
+        for camera_id, frame, dirty, start, count in pending:
+            summaries[camera_id] = self._process_lot_scan(
+                camera_id, frame, results[start:start + count], dirty)
+
+        return {camera_id: summaries[camera_id] for camera_id in frames_by_camera}
+
+    def _get_lot_lock(self, camera_id):
+        with self.lot_locks_guard:
+            return self.lot_locks.setdefault(camera_id, threading.Lock())
+
+    def _get_lot_analyzer(self, camera_id):
+        analyzer = self.lot_analyzers.get(camera_id)
+        if analyzer is not None:
+            return analyzer
+        class_list = self.apsd.get_class_list()
+        # stream and request threads can race on a new camera
+        with self.lot_locks_guard:
+            return self.lot_analyzers.setdefault(
+                camera_id, ParkingSpotAnalyzer(class_list=class_list))
+
+    def _check_lot_frame(self, camera_id, lot_image):
+        """
+        Change gating before inference. Returns (cached_summary, dirty):
+        the camera's previous summary when no spot changed since its last
+        inference, else None plus the changed spot indexes (None = all).
+        """
+        if not self.change_gating:
+            return None, None
+
+        with self._get_lot_lock(camera_id):
+            summary = self.last_summaries.get(camera_id)
+            detector = self.change_detectors.get(camera_id)
+            if summary is None or detector is None:
+                return None, None
+
+            dirty = detector.dirty_spots(lot_image)
+            if dirty == []:
+                return summary.copy(), dirty
+            if self._get_lot_analyzer(camera_id).layout is None:
+                dirty = None   # full-frame detection re-reads every spot
+            return None, dirty
+
+    def get_change_stats(self):
+        """{camera_id: {"checked": n, "skipped": n}} for change gating."""
+        return {camera_id: dict(detector.stats)
+                for camera_id, detector in self.change_detectors.items()}
+
+    def get_plate_cache_stats(self):
+        """Hit/miss counters of the plate-read cache, None without one."""
+        return self.anpr.cache.stats() if self.anpr.cache is not None else None
 
-        scan_id = self._bump_scan_id()
-        base_name = f"scan_{scan_id}"
-        output_path = os.path.join(OUTPUT_FOLDER, f"{base_name}_annotated.jpg")
-
-        try:
-            self.analyzer.save(output_path=output_path)
-        except TypeError:
-            self.analyzer.save(output_path)
+    # ------------------------------------------------------------------
+    # LOT LAYOUT
+    # ------------------------------------------------------------------
 
-        # calculate
-        summary = self.analyzer.get_parking_summary()
-        empty_spots = summary["empty_spots"]
+    def calibrate_lot(self, lot_image=None, camera_id=DEFAULT_CAMERA,
+                      layout_path=None):
+        """
+        Freeze the camera's spot boxes as its layout: from a full-frame
+        scan of `lot_image`, or from the last scan when omitted. Later
+        scans classify only the spot crops and keep spot numbers stable.
+
+        The calibration frame only feeds the analyzer: it is not counted
+        as a scan, saved, or used to track and assign spots.
+        """
+        analyzer = self._get_lot_analyzer(camera_id)
+        with self._get_lot_lock(camera_id):
+            if lot_image is not None:
+                analyzer.clear_layout()
+                analyzer.add_image_direct(lot_image)
+                analyzer.analyze(self.apsd.predict(lot_image))
+
+            layout = analyzer.calibrate()
+            self._reset_lot_state(camera_id)
+            if layout_path:
+                analyzer.save_layout(layout_path)
+        return layout
+
+    def load_lot_layout(self, layout_path, camera_id=DEFAULT_CAMERA):
+        analyzer = self._get_lot_analyzer(camera_id)
+        with self._get_lot_lock(camera_id):
+            layout = analyzer.load_layout(layout_path)
+            self._reset_lot_state(camera_id)
+        return layout
+
+    def set_spot_window(self, window, camera_id=DEFAULT_CAMERA):
+        """Debounce window of one camera's spots (e.g. a continuous stream)."""
+        with self._get_lot_lock(camera_id):
+            self.spot_windows[camera_id] = max(1, int(window))
+            self.spot_trackers.pop(camera_id, None)
+
+    def _reset_lot_state(self, camera_id):
+        """
+        Spot geometry changed: the next frame goes through the model and
+        spot history starts over, since spot numbers may have moved.
+        """
+        self.change_detectors.pop(camera_id, None)
+        self.last_summaries.pop(camera_id, None)
+        self.spot_trackers.pop(camera_id, None)
+
+    def get_annotated_image(self, camera_id=DEFAULT_CAMERA):
+        """Annotated frame of the camera's last scan, or None."""
+        analyzer = self.lot_analyzers.get(camera_id)
+        snapshot = analyzer.snapshot() if analyzer is not None else None
+        return snapshot.render() if snapshot is not None else None
+
+    def _process_lot_scan(self, camera_id, lot_image, results, dirty=None):
+        with self._get_lot_lock(camera_id):
+            self.refresh_db()
+            analyzer = self._get_lot_analyzer(camera_id)
+            analyzer.add_image_direct(lot_image)
+            if analyzer.layout is not None:
+                analyzer.classify_spots(results, dirty)
+            else:
+                analyzer.analyze(results)
+
+            # save with persistent scan index (in the background)
+            OUTPUT_FOLDER = "./output/apsd/"
+
+            scan_id = self._bump_scan_id()
+            base_name = f"scan_{scan_id}"
+            if camera_id != DEFAULT_CAMERA:
+                base_name = f"{base_name}_{camera_id}"
+            output_path = os.path.join(OUTPUT_FOLDER, f"{base_name}_annotated.jpg")
+
+            policy = self.retention["apsd"]
+            if policy.should_save(failed=len(analyzer.spot_coords) == 0):
+                # drawn on the writer thread, only for scans that are kept
+                self.artifact_writer.submit(
+                    policy.run, analyzer.snapshot().save, output_path,
+                    policy.write_params())
+
+            # calculate
+            summary = analyzer.get_parking_summary()
+
+            if self.change_gating:
+                detector = self.change_detectors.setdefault(
+                    camera_id, ChangeDetector())
+                detector.set_reference(
+                    lot_image, analyzer.spot_coords, indexes=dirty)
+                self.last_summaries[camera_id] = summary.copy()
+
+            tracker = self.spot_trackers.get(camera_id)
+            if tracker is None:
+                tracker = SpotTracker(window=self.spot_windows.get(
+                    camera_id, self.spot_window))
+                self.spot_trackers[camera_id] = tracker
+
+            events = tracker.update(*analyzer.get_occupancy())
+            arrived = [e["spot"] for e in events if e["event"] == "arrived"]
+
+            # Without a frozen layout one missed detection renumbers the
+            # spots, and without smoothing nothing filters it out, so only
+            # a single new arrival is trusted there.
+            if len(arrived) > 1 and (analyzer.layout is None or tracker.window == 1):
+                arrived = []
+            if arrived:
+                self._assign_new_spots(arrived, camera_id)
 
-        if self.previous_empty_spots is None:
-            self.previous_empty_spots = empty_spots.copy()
             return summary.copy()
 
-        newly_taken = list(set(self.previous_empty_spots) - set(empty_spots))
-
-        if len(newly_taken) == 1:
-            self._assign_new_spot(newly_taken[0])
-
-        self.previous_empty_spots = empty_spots.copy()
-
-        return summary.copy()
-
     # ------------------------------------------------------------------
     # Assign spot
     # ------------------------------------------------------------------
 
-    def _assign_new_spot(self, spot_number):
-        Car = Query()
-        entering = self.sessions.search(Car.status == "entering")
-
-        if not entering:
-            return
-
-        latest = sorted(
-            entering, key=lambda x: x["session_id"], reverse=True)[0]
+    @with_db_lock
+    def _assign_new_spots(self, spot_numbers, camera_id=DEFAULT_CAMERA):
+        """
+        Match every newly occupied spot to an entering car in one pass
+        (SpotAssigner) and write all the session updates at once.
+        """
+        entering = self.session_store.by_status("entering")
+        pairs = self.spot_assigner.match(entering, spot_numbers, camera_id)
+        if not pairs:
+            return []
+
+        park_time = now()
+        updates = []
+        for session, spot_number in pairs:
+            fields = {
+                "spot": spot_number,
+                "status": "parked",
+                "park_time": park_time
+            }
+            if camera_id != DEFAULT_CAMERA:
+                fields["camera"] = camera_id
+            updates.append((session["session_id"], fields))
 
-        self.sessions.update({
-            "spot": spot_number,
-            "status": "parked",
-            "park_time": now()
-        }, Car.session_id == latest["session_id"])
+        self.session_store.update_many(updates)
+        self._mark_synced()
+        return updates
 
     # ------------------------------------------------------------------
     # EVENT 3: EXIT
     # ------------------------------------------------------------------
 
-    def handle_exit(self, exit_image_path):
-        plate_raw = self.anpr.detect(exit_image_path)
-        plate = slug_plate(plate_raw)
+    def handle_exit(self, exit_image):
+        """`exit_image`: same forms as handle_entry()'s gate_image."""
+        read = self._read_plate(exit_image)
+        return self._record_exit(read)
 
-        Car = Query()
+    @with_db_lock
+    def _record_exit(self, read):
+        self.refresh_db()
+        plate_raw = read.text
+        plate = self._match_active_plate(slug_plate(plate_raw))
 
         latest = self._latest_session(plate)
+
+        # Save ANPR debug outputs for exit (in the background)
+        self._save_anpr_outputs(
+            read, "./output/anpr/exit", "exit_scan",
+            failed=latest is None or plate_raw == "N/A")
+
         if latest is None:
             return None
 
-        self.sessions.update({
+        self.session_store.update(latest["session_id"], {
             "status": "exited",
             "exit_time": now(),
             "previous_spot": latest["spot"],
             "spot": None
-        }, Car.session_id == latest["session_id"])
-
-        # Save ANPR debug outputs for exit
-        try:
-            anpr_folder = "./output/anpr/exit"
-            os.makedirs(anpr_folder, exist_ok=True)
-            prefix = f"exit_scan_{self._bump_scan_id()}"
-            self.anpr.save(folder=anpr_folder, prefix=prefix)
-        except Exception as e:
-            print(f"[WARN] Failed to save ANPR exit images: {e}")
+        })
+        self._mark_synced()
 
         return plate
 
     # ------------------------------------------------------------------
-    # DB ACCESS HELPERS
+    # DEBUG OUTPUTS
     # ------------------------------------------------------------------
 
-    def reload_db(self):
-        """Reload TinyDB and tables to reflect latest JSON state."""
-        self.db = TinyDB(self.db_path)
-        self.sessions = self.db.table("sessions")
-        self.allowed = self.db.table("allowed_cars")
-        self.meta = self.db.table("meta")
-        self.next_scan_id = self._get_next_scan_id()
+    def _save_anpr_outputs(self, read, folder, name, failed=False):
+        """Queue a PlateRead's images if the stage's retention keeps them."""
+        prefix = f"{name}_{self._bump_scan_id()}"
+        policy = self.retention["anpr"]
+        if not policy.should_save(failed=failed):
+            return
+
+        self.artifact_writer.submit(
+            policy.run, self.anpr.save, folder, prefix, read,
+            kinds=policy.kinds, params=policy.write_params())
 
-    def get_db(self):
-        self.reload_db()
-        return self.sessions.all()
+    # ------------------------------------------------------------------
+    # SHUTDOWN
+    # ------------------------------------------------------------------
 
-    def get_current_sessions(self):
-        self.reload_db()
-        Car = Query()
-        return self.sessions.search((Car.status == "entering") | (Car.status == "parked"))
+    def warm_up(self, background=False):
+        """Load the models and run one inference each (see ModelRegistry)."""
+        return self.registry.warm_up(background=background)
 
-    def get_past_sessions(self):
-        self.reload_db()
-        Car = Query()
-        return self.sessions.search(Car.status == "exited")
+    def is_ready(self):
+        return self.registry.is_ready()
 
-    def get_sessions_of_plate(self, plate: str):
-        self.reload_db()
-        Car = Query()
-        return self.sessions.search(Car.plate == slug_plate(plate))
+    def close(self):
+        """
+        Flush pending debug images and close storage. The models are shared
+        and stay loaded; registry.close() stops OCR workers.
+        """
+        self.artifact_writer.close()
+        self.backend.close()
 
+    # ------------------------------------------------------------------
+    # DB ACCESS HELPERS
+    # ------------------------------------------------------------------
+
+    def _open_backend(self, db_path, storage):
+        """
+        `storage` is a key of STORAGE_BACKENDS or a ready backend object.
+        When omitted it is picked from the file extension (.db/.sqlite ->
+        SQLite, anything else -> TinyDB JSON).
+        """
+        if storage is None:
+            is_sqlite = db_path.lower().endswith(SQLITE_EXTENSIONS)
+            storage = "sqlite" if is_sqlite else "json"
+        if not isinstance(storage, str):
+            return storage
+        if storage not in STORAGE_BACKENDS:
+            raise ValueError(
+                f"Unknown storage '{storage}'. Use one of {list(STORAGE_BACKENDS)}")
+        return STORAGE_BACKENDS[storage](db_path)
+
+    def _db_stamp(self):
+        """Cheap change marker for the data on disk."""
+        return self.backend.stamp()
+
+    def _mark_synced(self):
+        """Record that our in-memory state matches the file after a write."""
+        self._synced_stamp = self._db_stamp()
+
+    @with_db_lock
+    def reload_db(self):
+        """Reload the backend and indexes to reflect the latest state on disk."""
+        self.backend.reload()
+        self.session_store.reload()
+        self.next_scan_id = self._get_next_scan_id()
+        self._load_allowed()
+        self._mark_synced()
+
+    @with_db_lock
+    def refresh_db(self):
+        """
+        Reload only if the file changed since we last read or wrote it,
+        e.g. when another ParkingSystem instance shares the same db_path.
+        """
+        if self._db_stamp() != self._synced_stamp:
+            self.reload_db()
+
+    @with_db_lock
+    def get_db(self, limit=None, offset=0):
+        self.refresh_db()
+        if limit is None and not offset:
+            return self.session_store.all()
+        return self.session_store.page(limit=limit, offset=offset)
+
+    @with_db_lock
+    def get_current_sessions(self, limit=None, offset=0):
+        self.refresh_db()
+        return self.session_store.page(
+            statuses=("entering", "parked"), limit=limit, offset=offset)
+
+    @with_db_lock
+    def get_past_sessions(self, limit=None, offset=0):
+        self.refresh_db()
+        return self.session_store.page(
+            statuses=("exited",), limit=limit, offset=offset)
+
+    @with_db_lock
+    def get_sessions_of_plate(self, plate: str, limit=None, offset=0):
+        self.refresh_db()
+        return self.session_store.page(
+            plate=slug_plate(plate), limit=limit, offset=offset)
+
+    @with_db_lock
     def get_last_session_of_plate(self, plate: str):
-        self.reload_db()
-        rows = self.get_sessions_of_plate(plate)
-        if not rows:
-            return None
-        return sorted(rows, key=lambda x: x["session_id"], reverse=True)[0]
+        self.refresh_db()
+        return self.session_store.latest(slug_plate(plate))
+
+    @with_db_lock
+    def find_similar_plates(self, plate: str, max_distance=2):
+        """
+        Open sessions and allowed plates within max_distance edits of
+        `plate` (after folding O/0, B/8, I/1 ...), closest first:
+        {"plate", "normalized", "sessions": [...], "allowed": [...]}.
+        """
+        self.refresh_db()
+        plate = slug_plate(plate)
+        sessions = [
+            dict(self.session_store.active(match), distance=distance)
+            for match, distance in self.session_store.similar_active(plate, max_distance)
+        ]
+        allowed = [
+            {"plate": match, "distance": distance}
+            for match, distance in self.allowed_index.search(plate, max_distance)
+        ]
+        return {
+            "plate": plate,
+            "normalized": normalize_plate(plate),
+            "sessions": sessions,
+            "allowed": allowed,
+        }
 
     # ------------------------------------------------------------------
     # ALLOWED CAR CHECK
     # ------------------------------------------------------------------
 
+    @with_db_lock
+    def _load_allowed(self):
+        """
+        In-memory plate -> [doc_id] map so the gate check is O(1), plus a
+        similarity index over the same plates.
+        """
+        self.allowed_plates = {}
+        self.allowed_index = PlateIndex()
+        for doc_id, row in self.backend.load("allowed_cars"):
+            self.allowed_plates.setdefault(row.get("plate"), []).append(doc_id)
+            self.allowed_index.add(row.get("plate"))
+
+    @with_db_lock
     def is_allowed(self, plate: str) -> bool:
-        Car = Query()
-        return self.allowed.contains(Car.plate == plate)
+        """
+        Exact match. With fold_allowed_plates, also the same plate once OCR
+        confusions (O/0, B/8, I/1 ...) are folded, which admits any plate
+        that folds the same (a8c-123 when abc-123 is allowed).
+        """
+        self.refresh_db()
+        if plate in self.allowed_plates:
+            return True
+        return self.fold_allowed_plates and bool(self.allowed_index.search(plate, 0))
 
+    @with_db_lock
     def add_allowed(self, plate: str):
+        self.refresh_db()
         plate = slug_plate(plate)
-        Car = Query()
 
-        if not self.allowed.contains(Car.plate == plate):
-            self.allowed.insert({"plate": plate})
+        if plate not in self.allowed_plates:
+            doc_id = self.backend.insert("allowed_cars", {"plate": plate})
+            self.allowed_plates[plate] = [doc_id]
+            self.allowed_index.add(plate)
+            self._mark_synced()
             return True
         return False
 
+    @with_db_lock
+    def add_allowed_bulk(self, plates):
+        """Add many plates in a single backend write. Returns the new ones."""
+        self.refresh_db()
+
+        new_plates = []
+        seen = set(self.allowed_plates)
+        for plate in plates:
+            plate = slug_plate(plate)
+            if plate and plate not in seen:
+                seen.add(plate)
+                new_plates.append(plate)
+
+        if not new_plates:
+            return []
+
+        doc_ids = self.backend.insert_many(
+            "allowed_cars", [{"plate": plate} for plate in new_plates])
+        for plate, doc_id in zip(new_plates, doc_ids):
+            self.allowed_plates[plate] = [doc_id]
+            self.allowed_index.add(plate)
+
+        self._mark_synced()
+        return new_plates
+
+    @with_db_lock
     def remove_allowed(self, plate: str):
         plate = slug_plate(plate)
-        Car = Query()
-        self.allowed.remove(Car.plate == plate)
-
+        self.refresh_db()
+        doc_ids = self.allowed_plates.pop(plate, [])
+        if doc_ids:
+            self.allowed_index.remove(plate)
+            self.backend.remove("allowed_cars", doc_ids)
+            self._mark_synced()
+
+    @with_db_lock
     def get_allowed_list(self):
-        return self.allowed.all()
+        self.refresh_db()
+        return [row for _, row in self.backend.load("allowed_cars")]
@@ -7,8 +7,9 @@ from constant import CONST
 
 
 class SceneController:
-    def __init__(self):
-        self.ps = ParkingSystem()
+    def __init__(self, ps=None):
+        # pass the app's ParkingSystem to share its models and storage
+        self.ps = ps or ParkingSystem()
 
         # Load directly from config.py
         self.scenes = CONST["scenes"]
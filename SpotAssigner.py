@@ -0,0 +1,84 @@
+# SpotAssigner.py
+
+from datetime import datetime
+
+
+class SpotAssigner:
+    """
+    Matches the spots that became occupied in one lot scan to the cars
+    still "entering", all in one pass.
+
+    A car that entered t seconds ago most likely took a spot whose
+    gate-to-spot travel time is close to t. Sorting the cars by time since
+    entry and the spots by travel time and pairing them in that order
+    minimises the total |elapsed - travel| mismatch, in O(n log n).
+
+    - travel_times: {camera_id: seconds} or {camera_id: {spot: seconds}};
+      spots without an estimate use default_travel_s
+    - zones: {camera_id: zone}; a session with a "zone" field only matches
+      spots of cameras in that zone, sessions without one match anywhere
+    - max_wait_s: sessions entering for longer are treated as stale
+    - min_travel_ratio: a car can't park before reaching the spot, so
+      sessions younger than ratio x the shortest travel time are skipped
+
+    With more candidate cars than spots, the ones whose time since entry
+    is closest to the spots' median travel time are used, so a session
+    left "entering" hours ago loses to a car that just drove in.
+    """
+
+    def __init__(self, travel_times=None, default_travel_s=60.0, zones=None,
+                 max_wait_s=None, min_travel_ratio=0.0):
+        self.travel_times = travel_times or {}
+        self.default_travel_s = default_travel_s
+        self.zones = zones or {}
+        self.max_wait_s = max_wait_s
+        self.min_travel_ratio = min_travel_ratio
+
+    def travel_time(self, camera_id, spot):
+        estimate = self.travel_times.get(camera_id, self.default_travel_s)
+        if isinstance(estimate, dict):
+            return estimate.get(spot, estimate.get(str(spot), self.default_travel_s))
+        return estimate
+
+    def _elapsed(self, session, now):
+        try:
+            entered = datetime.fromisoformat(session["entry_time"])
+        except (KeyError, TypeError, ValueError):
+            return None
+        return (now - entered).total_seconds()
+
+    def match(self, sessions, spots, camera_id, now=None):
+        """
+        Pair entering sessions with newly occupied spots.
+        Returns [(session, spot), ...]; leftovers on either side stay
+        unmatched.
+        """
+        if not sessions or not spots:
+            return []
+        now = now or datetime.now()
+        zone = self.zones.get(camera_id)
+
+        spots = sorted(spots, key=lambda spot: (self.travel_time(camera_id, spot), spot))
+        shortest = self.travel_time(camera_id, spots[0])
+        typical = self.travel_time(camera_id, spots[len(spots) // 2])
+
+        candidates = []
+        for session in sessions:
+            if session.get("zone") not in (None, zone):
+                continue
+            elapsed = self._elapsed(session, now)
+            if elapsed is None:
+                continue
+            if self.max_wait_s is not None and elapsed > self.max_wait_s:
+                continue
+            if elapsed < shortest * self.min_travel_ratio:
+                continue
+            # zoned cars first: they can't go anywhere else
+            candidates.append((session.get("zone") is None, abs(elapsed - typical),
+                               session["session_id"], elapsed, session))
+
+        # best fitting cars first, keep as many as there are spots
+        candidates.sort(key=lambda c: c[:3])
+        chosen = sorted(candidates[:len(spots)], key=lambda c: (c[3], c[2]))
+
+        return [(c[4], spot) for c, spot in zip(chosen, spots)]
@@ -0,0 +1,244 @@
+# StreamIngestor.py
+
+import threading
+import time
+
+import cv2
+
+from ParkingSystem import DEFAULT_CAMERA
+
+
+class StreamIngestor:
+    """
+    Continuous lot monitoring from a video file or a camera stream
+    (RTSP/HTTP URL or device index).
+
+    A reader thread pulls frames from cv2.VideoCapture and only keeps the
+    newest one. A scan thread takes that frame at most `scan_fps` times per
+    second and feeds ParkingSystem.scan_parking_lot. When a scan takes
+    longer than the frame interval, older frames are dropped instead of
+    queued, so scans always see a recent frame.
+
+    Video files are read at their own frame rate (realtime=True), so the
+    sampling matches what a live camera would deliver.
+
+    spot_window sets the camera's spot debounce window when the stream
+    starts (see ParkingSystem.set_spot_window); None keeps the system's.
+    """
+
+    def __init__(self, ps, source, scan_fps=1.0, camera_id=DEFAULT_CAMERA,
+                 loop=False, realtime=None, spot_window=None):
+        self.ps = ps
+        self.source = source
+        self.scan_interval = 1.0 / scan_fps if scan_fps else 0.0
+        self.camera_id = camera_id
+        self.loop = loop
+        self.spot_window = spot_window
+
+        is_stream = isinstance(source, int) or str(source).startswith(
+            ("rtsp://", "rtmp://", "http://", "https://"))
+        self.realtime = (not is_stream) if realtime is None else realtime
+
+        self.capture = None
+        self.running = False
+        self.threads = []
+
+        # newest frame slot, shared by the two threads
+        self.cond = threading.Condition()
+        self.frame = None
+        self.frame_time = None
+        self.frame_seq = 0
+        self.reader_done = False
+
+        self.metrics = {
+            "frames_read": 0,
+            "frames_scanned": 0,
+            "frames_dropped": 0,
+            "scans_failed": 0,
+            "last_scan_ms": None,
+            "avg_scan_ms": None,
+            "last_lag_ms": None,
+            "max_lag_ms": None,
+        }
+        self.started_at = None
+        self.finished_at = None
+        self.last_summary = None
+        self.last_error = None
+
+    # ------------------------------------------------------------
+    # CONTROL
+    # ------------------------------------------------------------
+
+    def start(self):
+        if self.running:
+            return self
+
+        self.capture = cv2.VideoCapture(self.source)
+        if not self.capture.isOpened():
+            raise ValueError(f"Could not open video source: {self.source}")
+
+        if self.spot_window:
+            self.ps.set_spot_window(self.spot_window, self.camera_id)
+
+        self.running = True
+        self.reader_done = False
+        self.started_at = time.monotonic()
+        self.finished_at = None
+        self.threads = [
+            threading.Thread(target=self._read_loop, daemon=True,
+                             name=f"stream-reader-{self.camera_id}"),
+            threading.Thread(target=self._scan_loop, daemon=True,
+                             name=f"stream-scanner-{self.camera_id}"),
+        ]
+        for thread in self.threads:
+            thread.start()
+        return self
+
+    def stop(self, timeout=5.0):
+        self.running = False
+        with self.cond:
+            self.cond.notify_all()
+        for thread in self.threads:
+            thread.join(timeout)
+        self.threads = []
+        if self.capture is not None:
+            self.capture.release()
+            self.capture = None
+
+    def wait(self, timeout=None):
+        """Block until the source is exhausted (video files) or stop()."""
+        for thread in list(self.threads):
+            thread.join(timeout)
+
+    def is_running(self):
+        return self.running and any(t.is_alive() for t in self.threads)
+
+    def get_metrics(self):
+        with self.cond:
+            metrics = dict(self.metrics)
+        elapsed = 0.0
+        if self.started_at:
+            elapsed = (self.finished_at or time.monotonic()) - self.started_at
+        metrics["source"] = str(self.source)
+        metrics["camera_id"] = self.camera_id
+        metrics["spot_window"] = self.spot_window
+        metrics["running"] = self.is_running()
+        metrics["elapsed_s"] = round(elapsed, 3)
+        metrics["read_fps"] = round(metrics["frames_read"] / elapsed, 2) if elapsed else 0.0
+        metrics["scan_fps"] = round(metrics["frames_scanned"] / elapsed, 2) if elapsed else 0.0
+        metrics["change_gating"] = self.ps.get_change_stats().get(self.camera_id)
+        metrics["last_error"] = self.last_error
+        metrics["last_summary"] = self.last_summary
+        return metrics
+
+    # ------------------------------------------------------------
+    # THREADS
+    # ------------------------------------------------------------
+
+    def _read_loop(self):
+        fps = self.capture.get(cv2.CAP_PROP_FPS) or 0
+        frame_interval = 1.0 / fps if self.realtime and fps > 0 else 0.0
+        next_frame_at = time.monotonic()
+
+        try:
+            while self.running:
+                ok, frame = self.capture.read()
+                if not ok:
+                    if self.loop and self.realtime:
+                        self.capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                        continue
+                    break
+
+                with self.cond:
+                    if self.frame is not None:
+                        # previous frame was never scanned
+                        self.metrics["frames_dropped"] += 1
+                    self.frame = frame
+                    self.frame_time = time.monotonic()
+                    self.frame_seq += 1
+                    self.metrics["frames_read"] += 1
+                    self.cond.notify_all()
+
+                if frame_interval:
+                    next_frame_at += frame_interval
+                    delay = next_frame_at - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+        finally:
+            with self.cond:
+                self.reader_done = True
+                self.cond.notify_all()
+
+    def _scan_loop(self):
+        next_scan_at = time.monotonic()
+
+        while self.running:
+            delay = next_scan_at - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+            with self.cond:
+                while self.running and self.frame is None and not self.reader_done:
+                    self.cond.wait(0.5)
+                if self.frame is None:
+                    break   # stopped, or source exhausted
+                frame, frame_time = self.frame, self.frame_time
+                self.frame = None
+
+            next_scan_at = time.monotonic() + self.scan_interval
+            lag_ms = (time.monotonic() - frame_time) * 1000
+
+            started = time.perf_counter()
+            try:
+                self.last_summary = self.ps.scan_parking_lot(
+                    frame, camera_id=self.camera_id)
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"[WARN] Stream scan failed ({self.camera_id}): {e}")
+                with self.cond:
+                    self.metrics["scans_failed"] += 1
+                continue
+            scan_ms = (time.perf_counter() - started) * 1000
+
+            with self.cond:
+                m = self.metrics
+                m["frames_scanned"] += 1
+                m["last_scan_ms"] = round(scan_ms, 2)
+                previous_avg = m["avg_scan_ms"] or scan_ms
+                m["avg_scan_ms"] = round(
+                    previous_avg + (scan_ms - previous_avg) / m["frames_scanned"], 2)
+                m["last_lag_ms"] = round(lag_ms, 2)
+                m["max_lag_ms"] = round(max(m["max_lag_ms"] or 0.0, lag_ms), 2)
+
+        self.finished_at = time.monotonic()
+        self.running = False
+
+
+# Testing the stream ingestor on a local video file #
+def main():
+    import sys
+    from ParkingSystem import ParkingSystem
+
+    if len(sys.argv) < 2:
+        print("Usage: python StreamIngestor.py <video file or stream url> [scan_fps]")
+        return
+
+    scan_fps = float(sys.argv[2]) if len(sys.argv) > 2 else 1.0
+    ingestor = StreamIngestor(ParkingSystem(), sys.argv[1], scan_fps=scan_fps)
+    ingestor.start()
+
+    try:
+        while ingestor.is_running():
+            time.sleep(2)
+            print(ingestor.get_metrics())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        ingestor.stop()
+
+    print("Final metrics:", ingestor.get_metrics())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,13 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
+import base64
+import binascii
 import cv2
+import numpy as np
 
 from ParkingSystem import ParkingSystem
 from SceneController import SceneController
+from StreamIngestor import StreamIngestor
 from utils.index import successRes as success_res, errorRes as error_res
 
 
@@ -11,12 +15,75 @@ app = Flask(__name__)
 CORS(app)
 
 ps = ParkingSystem()
-scene_controller = SceneController()
+ps.warm_up(background=True)   # load models now, serve /health meanwhile
+scene_controller = SceneController(ps)
+streams = {}   # camera_id -> StreamIngestor
+
+
+def page_args():
+    """?limit=&offset= query params for paginated list endpoints."""
+    limit = request.args.get("limit", type=int)
+    offset = request.args.get("offset", default=0, type=int)
+    return {"limit": limit, "offset": offset}
+
+
+def request_image(burst=False):
+    """
+    Image sent with an event request, decoded once into a numpy array:
+    - multipart upload in the `image` field (with burst=True, several
+      `image` files are frames of one car and come back as a list)
+    - JSON `image_b64` (base64 JPEG/PNG, data URLs allowed)
+    - JSON `image_path` (file already on the server)
+    Returns (image, error).
+    """
+    uploads = request.files.getlist("image")
+    data = request.get_json(silent=True) or {}
+
+    if burst and len(uploads) > 1:
+        images = [cv2.imdecode(np.frombuffer(u.read(), np.uint8), cv2.IMREAD_COLOR)
+                  for u in uploads]
+        if any(img is None for img in images):
+            return None, "Could not decode image"
+        return images, None
+
+    upload = uploads[0] if uploads else None
+    if upload:
+        raw = upload.read()
+    elif data.get("image_b64"):
+        if not isinstance(data["image_b64"], str):
+            return None, "Invalid image_b64"
+        encoded = data["image_b64"].split(",", 1)[-1]
+        try:
+            raw = base64.b64decode(encoded, validate=True)
+        except (binascii.Error, ValueError):
+            return None, "Invalid image_b64"
+    elif data.get("image_path"):
+        if not isinstance(data["image_path"], str):
+            return None, "Invalid image_path"
+        img = cv2.imread(data["image_path"])
+        if img is None:
+            return None, "Could not load image"
+        return img, None
+    else:
+        return None, "Missing image (upload 'image', 'image_b64' or 'image_path')"
+
+    img = cv2.imdecode(np.frombuffer(raw, np.uint8), cv2.IMREAD_COLOR)
+    if img is None:
+        return None, "Could not decode image"
+    return img, None
 
 
 @app.get("/health")
 def health():
-    return jsonify(success_res("ok"))
+    """200 once the models are loaded and warm, 503 while they load."""
+    ready = ps.is_ready()
+    body = success_res({
+        "status": "ok" if ready else "loading",
+        "ready": ready,
+        "models": ps.registry.status(),
+        "plate_cache": ps.get_plate_cache_stats(),
+    })
+    return jsonify(body), 200 if ready else 503
 
 # ================================
 # Core API
@@ -25,19 +92,21 @@ def health():
 
 @app.get("/db")
 def db():
-    return jsonify(success_res(ps.get_db()))
+    return jsonify(success_res(ps.get_db(**page_args())))
 
 
 @app.post("/event/entry")
 def entry():
-    data = request.json
-    path = data.get("image_path")
+    img, error = request_image(burst=True)
 
-    if not path:
-        return jsonify(error_res("Missing image_path")), 400
+    if error:
+        return jsonify(error_res(error)), 400
+
+    data = request.get_json(silent=True) or {}
+    zone = data.get("zone") or request.form.get("zone")
 
     try:
-        session = ps.handle_entry(path)
+        session = ps.handle_entry(img, zone=zone)
         return jsonify(success_res(session))
     except Exception as e:
         return jsonify(error_res(str(e))), 500
@@ -45,15 +114,10 @@ def entry():
 
 @app.post("/event/scan")
 def scan():
-    data = request.json
-    path = data.get("image_path")
+    img, error = request_image()
 
-    if not path:
-        return jsonify(error_res("Missing image_path")), 400
-
-    img = cv2.imread(path)
-    if img is None:
-        return jsonify(error_res("Could not load image")), 400
+    if error:
+        return jsonify(error_res(error)), 400
 
     try:
         summary = ps.scan_parking_lot(img)
@@ -62,16 +126,71 @@ def scan():
         return jsonify(error_res(str(e))), 500
 
 
+@app.post("/event/scan/batch")
+def scan_batch():
+    data = request.json
+    paths = data.get("cameras")
+
+    if not paths:
+        return jsonify(error_res("Missing cameras")), 400
+
+    frames = {}
+    for camera_id, path in paths.items():
+        img = cv2.imread(path)
+        if img is None:
+            return jsonify(error_res(f"Could not load image for {camera_id}")), 400
+        frames[camera_id] = img
+
+    try:
+        summaries = ps.scan_parking_lots(frames)
+        return jsonify(success_res(summaries))
+    except Exception as e:
+        return jsonify(error_res(str(e))), 500
+
+
+@app.get("/lot/annotated")
+def lot_annotated():
+    camera_id = request.args.get("camera_id", "default")
+    image = ps.get_annotated_image(camera_id)
+
+    if image is None:
+        return jsonify(error_res(f"No scan yet for '{camera_id}'")), 404
+
+    ok, jpeg = cv2.imencode(".jpg", image)
+    if not ok:
+        return jsonify(error_res("Could not encode image")), 500
+    return Response(jpeg.tobytes(), mimetype="image/jpeg")
+
+
+@app.post("/lot/calibrate")
+def lot_calibrate():
+    data = request.get_json(silent=True) or {}
+    camera_id = data.get("camera_id", "default")
+    has_image = "image" in request.files or data.get("image_b64") or data.get("image_path")
+
+    img = None
+    if has_image:
+        img, error = request_image()
+        if error:
+            return jsonify(error_res(error)), 400
+
+    try:
+        layout = ps.calibrate_lot(
+            img, camera_id=camera_id, layout_path=data.get("layout_path"))
+        return jsonify(success_res({"camera_id": camera_id, "spots": len(layout)}))
+    except Exception as e:
+        return jsonify(error_res(str(e))), 500
+
+
 @app.post("/event/exit")
 def exit_event():
-    data = request.json
-    path = data.get("image_path")
+    img, error = request_image(burst=True)
 
-    if not path:
-        return jsonify(error_res("Missing image_path")), 400
+    if error:
+        return jsonify(error_res(error)), 400
 
     try:
-        session = ps.handle_exit(path)
+        session = ps.handle_exit(img)
         return jsonify(success_res(session))
     except Exception as e:
         return jsonify(error_res(str(e))), 500
@@ -96,23 +215,73 @@ def run_scene(scene_id):
         return jsonify(error_res(str(e))), 500
 
 
+# ================================
+# STREAM API
+# ================================
+
+@app.post("/stream/start")
+def stream_start():
+    data = request.json
+    source = data.get("source")
+    camera_id = data.get("camera_id", "default")
+
+    if source is None:
+        return jsonify(error_res("Missing source")), 400
+
+    current = streams.get(camera_id)
+    if current and current.is_running():
+        return jsonify(error_res(f"Stream '{camera_id}' already running")), 400
+
+    try:
+        streams[camera_id] = StreamIngestor(
+            ps, source,
+            scan_fps=float(data.get("scan_fps", 1.0)),
+            camera_id=camera_id,
+            loop=bool(data.get("loop", False)),
+            spot_window=data.get("spot_window"),
+        ).start()
+        return jsonify(success_res(streams[camera_id].get_metrics()))
+    except Exception as e:
+        return jsonify(error_res(str(e))), 500
+
+
+@app.post("/stream/stop")
+def stream_stop():
+    data = request.get_json(silent=True) or {}
+    camera_id = data.get("camera_id", "default")
+
+    ingestor = streams.pop(camera_id, None)
+    if ingestor is None:
+        return jsonify(error_res(f"No stream '{camera_id}'")), 404
+
+    ingestor.stop()
+    return jsonify(success_res(ingestor.get_metrics()))
+
+
+@app.get("/stream/status")
+def stream_status():
+    return jsonify(success_res({
+        camera_id: ingestor.get_metrics() for camera_id, ingestor in streams.items()
+    }))
+
+
 # ================================
 # SESSIONS API
 # ================================
 
 @app.get("/sessions/current")
 def sessions_current():
-    return jsonify(success_res(ps.get_current_sessions()))
+    return jsonify(success_res(ps.get_current_sessions(**page_args())))
 
 
 @app.get("/sessions/past")
 def sessions_past():
-    return jsonify(success_res(ps.get_past_sessions()))
+    return jsonify(success_res(ps.get_past_sessions(**page_args())))
 
 
 @app.get("/sessions/plate/<plate>")
 def sessions_plate_all(plate):
-    return jsonify(success_res(ps.get_sessions_of_plate(plate)))
+    return jsonify(success_res(ps.get_sessions_of_plate(plate, **page_args())))
 
 
 @app.get("/sessions/plate/<plate>/latest")
@@ -121,6 +290,13 @@ def sessions_plate_latest(plate):
     return jsonify(success_res(ps.get_last_session_of_plate(plate)))
 
 
+@app.get("/sessions/plate/<plate>/fuzzy")
+def sessions_plate_fuzzy(plate):
+    """Open sessions + allowed plates close to <plate> (?max_distance=2)."""
+    max_distance = request.args.get("max_distance", default=2, type=int)
+    return jsonify(success_res(ps.find_similar_plates(plate, max_distance)))
+
+
 # ================================
 # SECURITY TOGGLE API
 # ================================
@@ -169,6 +345,22 @@ def allowed_add():
     return jsonify(success_res({"added": added, "plate": plate}))
 
 
+@app.post("/allowed/import")
+def allowed_import():
+    data = request.json
+    plates = data.get("plates")
+
+    if not isinstance(plates, list):
+        return jsonify(error_res("Missing plates list")), 400
+
+    bad = [p for p in plates if not isinstance(p, str) or not p.strip()]
+    if bad:
+        return jsonify(error_res(f"Plates must be non-empty strings, got {bad[:5]}")), 400
+
+    added = ps.add_allowed_bulk(plates)
+    return jsonify(success_res({"added": added, "count": len(added)}))
+
+
 @app.post("/allowed/remove")
 def allowed_remove():
     data = request.json
@@ -182,4 +374,4 @@ def allowed_remove():
 
 
 if __name__ == "__main__":
-    app.run(port=5001, debug=True)
+    app.run(port=5001, debug=True, threaded=True)
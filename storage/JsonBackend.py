@@ -0,0 +1,72 @@
+import os
+from tinydb import TinyDB
+
+
+class JsonBackend:
+    """
+    Default storage backend: a single TinyDB JSON file.
+
+    Backends expose the same small, row-level interface so ParkingSystem can
+    swap them without touching its logic:
+    - load(table)              -> [(doc_id, row), ...]
+    - insert(table, row)       -> doc_id
+    - insert_many(table, rows) -> [doc_id, ...]   (one write)
+    - update(table, doc_id, fields)
+    - update_many(table, [(doc_id, fields), ...])  (one write)
+    - remove(table, doc_ids)
+    - stamp()                  -> cheap change marker for the data on disk
+    - reload() / close()
+
+    Note: TinyDB rewrites the whole file on every write.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.db = None
+        self.reload()
+
+    def reload(self):
+        if self.db is not None:
+            self.db.close()
+        self.db = TinyDB(self.path)
+
+    def close(self):
+        self.db.close()
+
+    def stamp(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    # ------------------------------------------------------------
+    # ROWS
+    # ------------------------------------------------------------
+
+    def load(self, table):
+        return [(doc.doc_id, dict(doc)) for doc in self.db.table(table).all()]
+
+    def insert(self, table, row):
+        return self.db.table(table).insert(row)
+
+    def insert_many(self, table, rows):
+        return self.db.table(table).insert_multiple(rows)
+
+    def update(self, table, doc_id, fields):
+        self.db.table(table).update(fields, doc_ids=[doc_id])
+
+    def update_many(self, table, updates):
+        rows = self.db.table(table)
+        existing = {doc.doc_id for doc in rows.all()}
+        updates = [(doc_id, fields) for doc_id, fields in updates if doc_id in existing]
+        if not updates:
+            return
+
+        # TinyDB calls the function once per listed doc_id, in list order
+        pending = iter([fields for _, fields in updates])
+        rows.update(lambda doc: doc.update(next(pending)),
+                    doc_ids=[doc_id for doc_id, _ in updates])
+
+    def remove(self, table, doc_ids):
+        self.db.table(table).remove(doc_ids=list(doc_ids))
@@ -0,0 +1,170 @@
+import json
+import os
+
+
+class LogBackend:
+    """
+    Append-only storage backend.
+
+    State lives in memory. Each write appends one JSON line to `<path>.log`
+    instead of rewriting the whole file. Every `compact_every` appended
+    events the current state is written as a snapshot to `path` (same layout
+    as the TinyDB JSON file, so existing databases open unchanged) and the
+    log is truncated.
+
+    Replaying the log is idempotent, so a crash between writing the snapshot
+    and truncating the log loses nothing.
+    """
+
+    def __init__(self, path, compact_every=1000, fsync=False):
+        self.path = path
+        self.log_path = f"{path}.log"
+        self.compact_every = compact_every
+        self.fsync = fsync
+
+        self._tables = {}
+        self._next_ids = {}
+        self._pending = 0
+        self._log = None
+        self.reload()
+
+    # ------------------------------------------------------------
+    # OPEN / REPLAY
+    # ------------------------------------------------------------
+
+    def reload(self):
+        self.close()
+        self._tables = {}
+
+        if os.path.exists(self.path) and os.path.getsize(self.path) > 0:
+            with open(self.path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+            for table, docs in snapshot.items():
+                self._tables[table] = {
+                    int(doc_id): row for doc_id, row in docs.items()
+                }
+
+        self._pending = 0
+        if os.path.exists(self.log_path):
+            valid_bytes = 0
+            with open(self.log_path, "rb") as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    try:
+                        event = json.loads(line)
+                    except json.JSONDecodeError:
+                        break
+                    self._apply(event)
+                    self._pending += 1
+                    valid_bytes += len(line)
+
+            # drop a torn last line left by a crash mid-append
+            if valid_bytes < os.path.getsize(self.log_path):
+                os.truncate(self.log_path, valid_bytes)
+
+        self._next_ids = {
+            table: max(docs, default=0) + 1
+            for table, docs in self._tables.items()
+        }
+        self._log = open(self.log_path, "a", encoding="utf-8")
+
+    def _apply(self, event):
+        docs = self._tables.setdefault(event["table"], {})
+        op = event["op"]
+
+        if op == "insert":
+            docs[event["id"]] = dict(event["row"])
+        elif op == "insert_many":
+            for doc_id, row in zip(event["ids"], event["rows"]):
+                docs[doc_id] = dict(row)
+        elif op == "update":
+            if event["id"] in docs:
+                docs[event["id"]].update(event["fields"])
+        elif op == "update_many":
+            for doc_id, fields in event["updates"]:
+                if doc_id in docs:
+                    docs[doc_id].update(fields)
+        elif op == "remove":
+            for doc_id in event["ids"]:
+                docs.pop(doc_id, None)
+
+    def close(self):
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+    def stamp(self):
+        marks = []
+        for path in (self.path, self.log_path):
+            try:
+                stat = os.stat(path)
+                marks.append((stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                marks.append(None)
+        return tuple(marks)
+
+    # ------------------------------------------------------------
+    # APPEND + COMPACTION
+    # ------------------------------------------------------------
+
+    def _append(self, event):
+        self._apply(event)
+        self._log.write(json.dumps(event) + "\n")
+        self._log.flush()
+        if self.fsync:
+            os.fsync(self._log.fileno())
+
+        self._pending += 1
+        if self.compact_every and self._pending >= self.compact_every:
+            self.compact()
+
+    def compact(self):
+        """Write a full snapshot and start a fresh log."""
+        snapshot = {
+            table: {str(doc_id): row for doc_id, row in docs.items()}
+            for table, docs in self._tables.items()
+        }
+
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+        self._log.close()
+        self._log = open(self.log_path, "w", encoding="utf-8")
+        self._pending = 0
+
+    # ------------------------------------------------------------
+    # ROWS
+    # ------------------------------------------------------------
+
+    def load(self, table):
+        docs = self._tables.get(table, {})
+        return [(doc_id, dict(row)) for doc_id, row in docs.items()]
+
+    def insert(self, table, row):
+        doc_id = self._next_ids.get(table, 1)
+        self._next_ids[table] = doc_id + 1
+        self._append({"op": "insert", "table": table, "id": doc_id, "row": row})
+        return doc_id
+
+    def insert_many(self, table, rows):
+        start = self._next_ids.get(table, 1)
+        doc_ids = list(range(start, start + len(rows)))
+        self._next_ids[table] = start + len(rows)
+        self._append({"op": "insert_many", "table": table,
+                      "ids": doc_ids, "rows": list(rows)})
+        return doc_ids
+
+    def update(self, table, doc_id, fields):
+        self._append({"op": "update", "table": table, "id": doc_id, "fields": fields})
+
+    def update_many(self, table, updates):
+        self._append({"op": "update_many", "table": table,
+                      "updates": [[doc_id, fields] for doc_id, fields in updates]})
+
+    def remove(self, table, doc_ids):
+        self._append({"op": "remove", "table": table, "ids": list(doc_ids)})
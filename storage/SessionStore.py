@@ -0,0 +1,155 @@
+from utils.PlateIndex import PlateIndex
+
+
+class SessionStore:
+    """
+    In-memory view of the sessions table with hash indexes on plate and
+    status, a similarity index over the plates of open sessions, plus a
+    running max session_id.
+
+    Gate events look sessions up through the indexes instead of scanning the
+    whole table. Every write goes to the storage backend first and is then
+    applied to the indexes, so the two never drift apart.
+    """
+
+    TABLE = "sessions"
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.reload()
+
+    # ------------------------------------------------------------
+    # INDEX MAINTENANCE
+    # ------------------------------------------------------------
+
+    def reload(self):
+        """Rebuild every index from the backend (one full read)."""
+        self._rows = {}
+        self._doc_ids = {}
+        self._by_plate = {}
+        self._by_status = {}
+        self._active_plates = PlateIndex()
+        self._max_session_id = 0
+
+        for doc_id, row in self.backend.load(self.TABLE):
+            self._index(doc_id, row)
+
+    def _index(self, doc_id, row):
+        session_id = row["session_id"]
+        self._rows[session_id] = row
+        self._doc_ids[session_id] = doc_id
+        self._by_plate.setdefault(row.get("plate"), set()).add(session_id)
+        self._by_status.setdefault(row.get("status"), set()).add(session_id)
+        if row.get("status") != "exited":
+            self._active_plates.add(row.get("plate"))
+        self._max_session_id = max(self._max_session_id, session_id)
+
+    def _unindex(self, session_id):
+        row = self._rows[session_id]
+        self._by_plate[row.get("plate")].discard(session_id)
+        self._by_status[row.get("status")].discard(session_id)
+        if row.get("status") != "exited":
+            self._active_plates.remove(row.get("plate"))
+
+    def _rows_for(self, session_ids):
+        return [dict(self._rows[i]) for i in sorted(session_ids)]
+
+    # ------------------------------------------------------------
+    # READS
+    # ------------------------------------------------------------
+
+    def __len__(self):
+        return len(self._rows)
+
+    def all(self):
+        return [dict(row) for row in self._rows.values()]
+
+    def get(self, session_id):
+        row = self._rows.get(session_id)
+        return dict(row) if row else None
+
+    def by_plate(self, plate):
+        return self._rows_for(self._by_plate.get(plate, ()))
+
+    def by_status(self, *statuses):
+        ids = set()
+        for status in statuses:
+            ids |= self._by_status.get(status, set())
+        return self._rows_for(ids)
+
+    def latest(self, plate):
+        """Most recent session of a plate, whatever its status."""
+        ids = self._by_plate.get(plate)
+        if not ids:
+            return None
+        return self.get(max(ids))
+
+    def active(self, plate):
+        """Most recent session of a plate that has not exited yet."""
+        ids = [
+            i for i in self._by_plate.get(plate, ())
+            if self._rows[i].get("status") != "exited"
+        ]
+        if not ids:
+            return None
+        return self.get(max(ids))
+
+    def similar_active(self, plate, max_distance=2):
+        """[(plate, distance), ...] of open sessions, closest first."""
+        return self._active_plates.search(plate, max_distance)
+
+    def closest_active(self, plate, max_distance=2):
+        """(plate, distance) of the single closest open session, or None."""
+        return self._active_plates.best(plate, max_distance)
+
+    def next_session_id(self):
+        return self._max_session_id + 1
+
+    def page(self, statuses=None, plate=None, limit=None, offset=0):
+        """Sessions ordered by session_id, optionally filtered and sliced."""
+        if plate is not None:
+            ids = set(self._by_plate.get(plate, ()))
+            if statuses:
+                ids = {i for i in ids if self._rows[i].get("status") in statuses}
+        elif statuses:
+            ids = set()
+            for status in statuses:
+                ids |= self._by_status.get(status, set())
+        else:
+            ids = self._rows.keys()
+
+        ids = sorted(ids)
+        end = None if limit is None else offset + limit
+        return self._rows_for(ids[offset:end])
+
+    # ------------------------------------------------------------
+    # WRITES
+    # ------------------------------------------------------------
+
+    def insert(self, row):
+        row = dict(row)
+        if row.get("session_id") is None:
+            row["session_id"] = self.next_session_id()
+        doc_id = self.backend.insert(self.TABLE, row)
+        self._index(doc_id, row)
+        return row
+
+    def update(self, session_id, fields):
+        doc_id = self._doc_ids[session_id]
+        self.backend.update(self.TABLE, doc_id, fields)
+        return self._apply_update(session_id, fields)
+
+    def update_many(self, updates):
+        """Several (session_id, fields) updates in one backend write."""
+        updates = list(updates)
+        self.backend.update_many(
+            self.TABLE, [(self._doc_ids[sid], fields) for sid, fields in updates])
+        return [self._apply_update(sid, fields) for sid, fields in updates]
+
+    def _apply_update(self, session_id, fields):
+        doc_id = self._doc_ids[session_id]
+        self._unindex(session_id)
+        row = self._rows[session_id]
+        row.update(fields)
+        self._index(doc_id, row)
+        return dict(row)
@@ -0,0 +1,314 @@
+import json
+import sqlite3
+import threading
+
+from utils.PlateIndex import PlateIndex
+
+
+# Columns pulled out of each row so they can be indexed.
+# The full row is always kept as JSON in `data`.
+INDEXED_COLUMNS = {
+    "sessions": ("session_id", "plate", "status"),
+    "allowed_cars": ("plate",),
+    "meta": ("key",),
+}
+
+
+class SqliteBackend:
+    """
+    SQLite storage backend (local file, no server).
+
+    Same row-level interface as JsonBackend/LogBackend, plus SQL access for
+    SqliteSessionStore. Runs in WAL mode so readers don't block the writer,
+    and uses a busy timeout so several processes can share one file.
+    All SQL uses constant statements with `?` parameters, which sqlite3
+    keeps prepared in its statement cache.
+    """
+
+    def __init__(self, path, timeout=5.0):
+        self.path = path
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(
+            path, timeout=timeout, check_same_thread=False,
+            isolation_level=None, cached_statements=256)
+        self.conn.row_factory = sqlite3.Row
+
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+
+    def _create_schema(self):
+        with self.lock:
+            for table, columns in INDEXED_COLUMNS.items():
+                cols = "".join(f", {c}" for c in columns)
+                self.conn.execute(
+                    f"CREATE TABLE IF NOT EXISTS {table} "
+                    f"(doc_id INTEGER PRIMARY KEY{cols}, data TEXT NOT NULL)")
+                for column in columns:
+                    unique = "UNIQUE " if column == "session_id" else ""
+                    self.conn.execute(
+                        f"CREATE {unique}INDEX IF NOT EXISTS "
+                        f"idx_{table}_{column} ON {table} ({column})")
+
+    def reload(self):
+        # nothing cached: every read goes to SQLite
+        pass
+
+    def close(self):
+        self.conn.close()
+
+    def stamp(self):
+        """Changes only when *another* connection commits."""
+        return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    # ------------------------------------------------------------
+    # HELPERS
+    # ------------------------------------------------------------
+
+    def transaction(self):
+        return _Transaction(self)
+
+    def query(self, sql, params=()):
+        with self.lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        return [json.loads(row["data"]) for row in rows]
+
+    def scalar(self, sql, params=()):
+        with self.lock:
+            row = self.conn.execute(sql, params).fetchone()
+        return row[0] if row else None
+
+    def _columns(self, table, row):
+        return [row.get(c) for c in INDEXED_COLUMNS.get(table, ())]
+
+    # ------------------------------------------------------------
+    # ROWS
+    # ------------------------------------------------------------
+
+    def load(self, table):
+        with self.lock:
+            rows = self.conn.execute(
+                f"SELECT doc_id, data FROM {table} ORDER BY doc_id").fetchall()
+        return [(row["doc_id"], json.loads(row["data"])) for row in rows]
+
+    def insert(self, table, row):
+        columns = INDEXED_COLUMNS.get(table, ())
+        names = "".join(f", {c}" for c in columns)
+        marks = ", ?" * len(columns)
+        with self.transaction():
+            cursor = self.conn.execute(
+                f"INSERT INTO {table} (data{names}) VALUES (?{marks})",
+                [json.dumps(row)] + self._columns(table, row))
+        return cursor.lastrowid
+
+    def insert_many(self, table, rows):
+        columns = INDEXED_COLUMNS.get(table, ())
+        names = "".join(f", {c}" for c in columns)
+        marks = ", ?" * len(columns)
+        sql = f"INSERT INTO {table} (data{names}) VALUES (?{marks})"
+        doc_ids = []
+        with self.transaction() as conn:
+            for row in rows:
+                cursor = conn.execute(
+                    sql, [json.dumps(row)] + self._columns(table, row))
+                doc_ids.append(cursor.lastrowid)
+        return doc_ids
+
+    def update(self, table, doc_id, fields):
+        self.update_many(table, [(doc_id, fields)])
+
+    def update_many(self, table, updates):
+        columns = INDEXED_COLUMNS.get(table, ())
+        sets = "".join(f", {c} = ?" for c in columns)
+        with self.transaction():
+            for doc_id, fields in updates:
+                found = self.conn.execute(
+                    f"SELECT data FROM {table} WHERE doc_id = ?", (doc_id,)).fetchone()
+                if found is None:
+                    continue
+                row = json.loads(found["data"])
+                row.update(fields)
+                self.conn.execute(
+                    f"UPDATE {table} SET data = ?{sets} WHERE doc_id = ?",
+                    [json.dumps(row)] + self._columns(table, row) + [doc_id])
+
+    def remove(self, table, doc_ids):
+        with self.transaction():
+            self.conn.executemany(
+                f"DELETE FROM {table} WHERE doc_id = ?",
+                [(doc_id,) for doc_id in doc_ids])
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE ... COMMIT/ROLLBACK, holding the backend lock."""
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def __enter__(self):
+        self.backend.lock.acquire()
+        try:
+            self.backend.conn.execute("BEGIN IMMEDIATE")
+        except BaseException:
+            # __exit__ won't run, so don't leave the lock held
+            self.backend.lock.release()
+            raise
+        return self.backend.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self.backend.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        finally:
+            self.backend.lock.release()
+        return False
+
+
+class SqliteSessionStore:
+    """
+    SessionStore with the same interface, answered by indexed SQL queries
+    instead of in-memory indexes. Nothing is loaded up front, so history and
+    paginated lists only pull the rows they return. The plate similarity
+    index is built on the first similarity lookup and dropped on reload().
+    """
+
+    TABLE = "sessions"
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._active_plates = None
+
+    def reload(self):
+        self._active_plates = None
+
+    def _track_active(self, old, new):
+        """Keep a built similarity index in step with one row change."""
+        if self._active_plates is None:
+            return
+        if old is not None and old.get("status") != "exited":
+            self._active_plates.remove(old.get("plate"))
+        if new is not None and new.get("status") != "exited":
+            self._active_plates.add(new.get("plate"))
+
+    # ------------------------------------------------------------
+    # READS
+    # ------------------------------------------------------------
+
+    def __len__(self):
+        return self.backend.scalar("SELECT COUNT(*) FROM sessions")
+
+    def all(self):
+        return self.backend.query("SELECT data FROM sessions ORDER BY session_id")
+
+    def get(self, session_id):
+        rows = self.backend.query(
+            "SELECT data FROM sessions WHERE session_id = ?", (session_id,))
+        return rows[0] if rows else None
+
+    def by_plate(self, plate):
+        return self.backend.query(
+            "SELECT data FROM sessions WHERE plate = ? ORDER BY session_id",
+            (plate,))
+
+    def by_status(self, *statuses):
+        marks = ", ".join("?" * len(statuses))
+        return self.backend.query(
+            f"SELECT data FROM sessions WHERE status IN ({marks}) "
+            f"ORDER BY session_id", statuses)
+
+    def latest(self, plate):
+        rows = self.backend.query(
+            "SELECT data FROM sessions WHERE plate = ? "
+            "ORDER BY session_id DESC LIMIT 1", (plate,))
+        return rows[0] if rows else None
+
+    def active(self, plate):
+        rows = self.backend.query(
+            "SELECT data FROM sessions WHERE plate = ? AND status != 'exited' "
+            "ORDER BY session_id DESC LIMIT 1", (plate,))
+        return rows[0] if rows else None
+
+    def _active_index(self):
+        if self._active_plates is None:
+            index = PlateIndex()
+            with self.backend.lock:
+                found = self.backend.conn.execute(
+                    "SELECT plate FROM sessions WHERE status != 'exited'").fetchall()
+            for (active,) in found:
+                index.add(active)
+            self._active_plates = index
+        return self._active_plates
+
+    def similar_active(self, plate, max_distance=2):
+        return self._active_index().search(plate, max_distance)
+
+    def closest_active(self, plate, max_distance=2):
+        return self._active_index().best(plate, max_distance)
+
+    def next_session_id(self):
+        return self.backend.scalar(
+            "SELECT COALESCE(MAX(session_id), 0) + 1 FROM sessions")
+
+    def page(self, statuses=None, plate=None, limit=None, offset=0):
+        where, params = [], []
+        if statuses:
+            where.append(f"status IN ({', '.join('?' * len(statuses))})")
+            params.extend(statuses)
+        if plate is not None:
+            where.append("plate = ?")
+            params.append(plate)
+
+        sql = "SELECT data FROM sessions"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY session_id LIMIT ? OFFSET ?"
+        params.extend([-1 if limit is None else limit, offset])
+        return self.backend.query(sql, params)
+
+    # ------------------------------------------------------------
+    # WRITES
+    # ------------------------------------------------------------
+
+    def insert(self, row):
+        row = dict(row)
+        with self.backend.transaction() as conn:
+            # allocate the id inside the write lock so concurrent writers
+            # never hand out the same session_id
+            if row.get("session_id") is None:
+                row["session_id"] = conn.execute(
+                    "SELECT COALESCE(MAX(session_id), 0) + 1 FROM sessions"
+                ).fetchone()[0]
+            conn.execute(
+                "INSERT INTO sessions (session_id, plate, status, data) "
+                "VALUES (?, ?, ?, ?)",
+                (row["session_id"], row.get("plate"), row.get("status"),
+                 json.dumps(row)))
+        self._track_active(None, row)
+        return row
+
+    def update(self, session_id, fields):
+        return self.update_many([(session_id, fields)])[0]
+
+    def update_many(self, updates):
+        """Several (session_id, fields) updates in one transaction."""
+        rows, changes = [], []
+        with self.backend.transaction() as conn:
+            for session_id, fields in updates:
+                found = conn.execute(
+                    "SELECT data FROM sessions WHERE session_id = ?",
+                    (session_id,)).fetchone()
+                if found is None:
+                    rows.append(None)
+                    continue
+                row = json.loads(found["data"])
+                changes.append((dict(row), row))
+                row.update(fields)
+                conn.execute(
+                    "UPDATE sessions SET plate = ?, status = ?, data = ? "
+                    "WHERE session_id = ?",
+                    (row.get("plate"), row.get("status"), json.dumps(row),
+                     session_id))
+                rows.append(row)
+        # only once committed
+        for old, new in changes:
+            self._track_active(old, new)
+        return rows
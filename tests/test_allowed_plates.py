@@ -0,0 +1,33 @@
+import pytest
+
+# ParkingSystem pulls in the ANPR module's image libraries
+pytest.importorskip("imutils")
+pytest.importorskip("matplotlib")
+
+from ParkingSystem import ParkingSystem
+
+
+def open_system(tmp_path, monkeypatch, **kwargs):
+    monkeypatch.chdir(tmp_path)
+    system = ParkingSystem(db_path=str(tmp_path / "db.json"), **kwargs)
+    system.add_allowed("ABC-123")
+    return system
+
+
+def test_allow_list_is_exact_by_default(tmp_path, monkeypatch):
+    ps = open_system(tmp_path, monkeypatch)
+    try:
+        assert ps.is_allowed("abc-123")
+        assert not ps.is_allowed("a8c-123")
+        assert not ps.is_allowed("abc-l23")
+    finally:
+        ps.close()
+
+
+def test_folded_allow_list_is_opt_in(tmp_path, monkeypatch):
+    ps = open_system(tmp_path, monkeypatch, fold_allowed_plates=True)
+    try:
+        assert ps.is_allowed("a8c-123")
+        assert not ps.is_allowed("abc-124")
+    finally:
+        ps.close()
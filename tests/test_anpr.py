@@ -0,0 +1,148 @@
+import time
+from concurrent.futures import Future
+
+import numpy as np
+import pytest
+
+# the ANPR module imports its plotting and contour helpers up front
+pytest.importorskip("imutils")
+pytest.importorskip("matplotlib")
+
+from ANPR.ANPR import ANPR, vote_plate
+
+PLATE_BOX = np.array([[[20, 20]], [[140, 20]], [[140, 60]], [[20, 60]]], np.int32)
+
+
+class StubReader:
+    """easyocr.Reader stand-in: answers readtext() calls in order."""
+
+    def __init__(self, *answers):
+        self.answers = list(answers)
+        self.images = []
+
+    def readtext(self, image):
+        self.images.append(image)
+        return self.answers.pop(0) if self.answers else []
+
+
+def engine_with(reader):
+    engine = ANPR()
+    engine.reader = reader
+    return engine
+
+
+def box(x1, y1, x2, y2):
+    return [[x1, y1], [x2, y1], [x2, y2], [x1, y2]]
+
+
+# ------------------------------------------------------------
+# vote_plate
+# ------------------------------------------------------------
+
+def test_vote_plate_takes_the_best_supported_character_per_position():
+    text, confidence = vote_plate([("ABC-123", 0.9), ("A8C-123", 0.5), ("ABC-128", 0.6)])
+
+    assert text == "ABC-123"
+    assert 0 < confidence <= 1
+
+
+def test_vote_plate_keeps_the_heaviest_length_group():
+    text, _ = vote_plate([("ABC123", 0.4), ("ABC1234", 0.9), ("ABC1234", 0.8)])
+
+    assert text == "ABC1234"
+
+
+def test_vote_plate_without_text():
+    assert vote_plate([("--", 0.9)]) == (None, None)
+
+
+# ------------------------------------------------------------
+# read_burst
+# ------------------------------------------------------------
+
+def test_burst_keeps_a_plate_read_on_a_single_tracked_frame(monkeypatch):
+    rng = np.random.default_rng(0)
+    sharp = rng.integers(0, 255, (120, 200, 3), dtype=np.uint8)   # anchor
+    soft = np.full((120, 200, 3), 120, np.uint8)
+    soft[20:60, 20:140] = 60
+
+    # glare on the anchor: nothing read there, the tracked frame reads it
+    reader = StubReader([], [(box(0, 0, 100, 30), "ABC123", 0.9)])
+    engine = engine_with(reader)
+    monkeypatch.setattr(engine, "_find_plate_contour",
+                        lambda read: setattr(read, "candidates", [PLATE_BOX]))
+    monkeypatch.setattr(engine, "_track",
+                        lambda grays, anchor, bbox, score: [bbox] * len(grays))
+
+    read = engine.read_burst([sharp, soft], max_ocr=2)
+
+    assert (read.text, read.confidence, read.valid) == ("ABC123", 0.9, True)
+
+
+# ------------------------------------------------------------
+# candidate OCR
+# ------------------------------------------------------------
+
+def test_stacked_batch_maps_text_boxes_back_to_their_crops():
+    reader = StubReader([
+        (box(50, 2, 70, 18), "123", 0.8),
+        (box(0, 2, 40, 18), "ABC", 0.9),
+        (box(0, 24, 40, 32), "GAP", 0.9),     # between the two crops
+        (box(0, 40, 50, 60), "XYZ", 0.7),
+    ])
+    engine = engine_with(reader)
+    crops = [np.zeros((20, 60), np.uint8), np.zeros((30, 80), np.uint8)]
+
+    results = engine._readtext_batch(crops)
+
+    assert [image.shape for image in reader.images] == [(66, 80)]
+    assert results == [[("ABC", 0.9), ("123", 0.8)], [("XYZ", 0.7)]]
+
+
+def test_score_joins_a_plate_split_in_two():
+    candidate = {}
+    engine_with(StubReader())._score(candidate, [("ABC", 0.9), ("123", 0.8)])
+
+    assert (candidate["text"], candidate["confidence"], candidate["valid"]) == \
+        ("ABC 123", 0.8, True)
+
+
+def test_score_falls_back_to_the_most_confident_box():
+    candidate = {}
+    engine_with(StubReader())._score(candidate, [("ABC123", 0.9), ("IND", 0.2)])
+
+    assert (candidate["text"], candidate["valid"]) == ("ABC123", True)
+
+
+def test_finish_prefers_valid_then_first_candidate_with_text():
+    engine = engine_with(StubReader())
+
+    def candidate(text, valid=False):
+        return {"contour": None, "bbox": None, "crop": None,
+                "text": text, "confidence": 0.5 if text else None, "valid": valid}
+
+    read = engine._load_image(np.zeros((10, 10), np.uint8))
+    read.candidates = [candidate(None), candidate("AB"), candidate("XY")]
+    engine._finish(read)
+    assert (read.text, read.valid) == ("AB", False)
+
+    read.candidates.append(candidate("ABC123", valid=True))
+    engine._finish(read)
+    assert (read.text, read.valid) == ("ABC123", True)
+
+
+def test_pool_batch_shares_one_timeout():
+    class StuckPool:
+        timeout = 0.2
+
+        def submit(self, crop):
+            return Future()   # never finishes
+
+    engine = ANPR()
+    engine.ocr_pool, engine.ocr_pool_ready = StuckPool(), True
+    started = time.monotonic()
+
+    results = engine._readtext_batch([np.zeros((20, 60), np.uint8)] * 4)
+
+    assert results == [[]] * 4
+    assert time.monotonic() - started < 0.5
@@ -0,0 +1,46 @@
+import pytest
+
+# ParkingSystem pulls in the ANPR module's image libraries
+pytest.importorskip("imutils")
+pytest.importorskip("matplotlib")
+
+from ANPR.ANPR import PlateRead
+from ParkingSystem import ParkingSystem
+
+
+def plate_read(text):
+    read = PlateRead()
+    read.text = text
+    read.valid = True
+    return read
+
+
+@pytest.fixture(params=["json", "log", "sqlite"])
+def ps(request, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    system = ParkingSystem(db_path=str(tmp_path / "db"), storage=request.param)
+    system.disable_security()
+    yield system
+    system.close()
+
+
+def statuses(ps):
+    return {row["plate"]: row["status"] for row in ps.get_db()}
+
+
+def test_misread_exit_closes_the_single_close_session(ps):
+    ps._record_entry(plate_read("ABC-123"))
+    ps._record_entry(plate_read("XYZ-789"))
+
+    assert ps._record_exit(plate_read("A8C-123")) == "abc-123"
+    assert statuses(ps) == {"abc-123": "exited", "xyz-789": "entering"}
+
+
+def test_retried_exit_does_not_close_a_similar_plate(ps):
+    ps._record_entry(plate_read("ABC-123"))
+    ps._record_entry(plate_read("ABC-124"))
+
+    assert ps._record_exit(plate_read("ABC-123")) == "abc-123"
+    assert ps._record_exit(plate_read("ABC-123")) == "abc-123"
+
+    assert statuses(ps) == {"abc-123": "exited", "abc-124": "entering"}
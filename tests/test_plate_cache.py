@@ -0,0 +1,68 @@
+import numpy as np
+
+from ANPR.PlateCache import PlateCache, content_key
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_least_recently_used_entry_is_evicted_first():
+    cache = PlateCache(max_entries=2, ttl_s=None)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1   # "b" is now the oldest
+
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    stats = cache.stats()
+    assert (stats["evictions"], stats["size"]) == (1, 2)
+
+
+def test_entries_expire_after_the_ttl(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr("ANPR.PlateCache.time.monotonic", clock)
+    cache = PlateCache(ttl_s=10)
+    cache.put("a", 1)
+    cache.put_crop(0b1, 2)
+
+    clock.now += 10
+    assert cache.get("a") == 1
+    clock.now += 0.5
+    assert cache.get("a") is None
+    assert cache.get_crop(0b1) is None
+    assert cache.stats()["expired"] == 2
+
+
+def test_crop_match_stops_at_crop_max_distance():
+    cache = PlateCache(crop_hash=True, crop_max_distance=3)
+    cache.put_crop(0b0000, "plate")
+
+    assert cache.get_crop(0b0111) == "plate"   # 3 bits apart
+    assert cache.get_crop(0b1111) is None       # 4 bits apart
+    stats = cache.stats()
+    assert (stats["crop_hits"], stats["crop_misses"]) == (1, 1)
+
+
+def test_closest_crop_wins():
+    cache = PlateCache(crop_hash=True, crop_max_distance=4)
+    cache.put_crop(0b0011, "far")
+    cache.put_crop(0b1000, "near")
+
+    assert cache.get_crop(0b0000) == "near"
+
+
+def test_content_key_of_a_path_matches_its_bytes(tmp_path):
+    path = tmp_path / "frame.jpg"
+    path.write_bytes(b"jpeg bytes")
+    image = np.zeros((4, 4), np.uint8)
+
+    assert content_key(str(path)) == content_key(b"jpeg bytes")
+    assert content_key(str(tmp_path / "missing.jpg")) is None
+    assert content_key(image) != content_key(image.astype(np.float32))
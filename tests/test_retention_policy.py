@@ -0,0 +1,35 @@
+import os
+
+from utils.RetentionPolicy import RetentionPolicy
+
+
+def write(path, size):
+    with open(path, "wb") as f:
+        f.write(b"x" * size)
+    return str(path)
+
+
+def test_first_batch_under_the_cap_is_kept(tmp_path):
+    policy = RetentionPolicy(max_folder_mb=0.5)
+    paths = [write(tmp_path / f"x_{name}.jpg", 100 * 1024) for name in "abcd"]
+
+    policy.record(paths)
+
+    assert all(os.path.exists(path) for path in paths)
+    files, total, _ = policy._folders[str(tmp_path)]
+    assert [path for path, _ in files] == paths
+    assert total == 400 * 1024
+
+
+def test_oldest_files_go_once_the_cap_is_passed(tmp_path):
+    policy = RetentionPolicy(max_folder_mb=0.25)
+    first = [write(tmp_path / "a.jpg", 100 * 1024), write(tmp_path / "b.jpg", 100 * 1024)]
+    policy.record(first)
+    policy.record(first[:1])   # saved again: not counted twice
+
+    third = write(tmp_path / "c.jpg", 100 * 1024)
+    policy.record([third])
+
+    assert not os.path.exists(first[0])
+    assert os.path.exists(first[1]) and os.path.exists(third)
+    assert policy._folders[str(tmp_path)][1] == 200 * 1024
@@ -0,0 +1,73 @@
+import sqlite3
+import threading
+
+import pytest
+
+from storage.SqliteBackend import SqliteBackend, SqliteSessionStore
+
+
+def test_concurrent_writers_get_distinct_session_ids(tmp_path):
+    path = str(tmp_path / "db.sqlite")
+    # one connection each, like separate processes sharing the file
+    stores = [SqliteSessionStore(SqliteBackend(path)) for _ in range(4)]
+    per_writer = 25
+    start = threading.Barrier(len(stores))
+
+    def write(store, writer):
+        start.wait()
+        for i in range(per_writer):
+            store.insert({"session_id": None, "plate": f"w{writer}-{i}",
+                          "status": "entering"})
+
+    threads = [threading.Thread(target=write, args=(store, n))
+               for n, store in enumerate(stores)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    rows = stores[0].all()
+    ids = [row["session_id"] for row in rows]
+    assert len(rows) == len(stores) * per_writer
+    assert sorted(ids) == list(range(1, len(rows) + 1))
+
+    for store in stores:
+        store.backend.close()
+
+
+def test_session_queries_use_indexed_columns(tmp_path):
+    store = SqliteSessionStore(SqliteBackend(str(tmp_path / "db.sqlite")))
+    first = store.insert({"session_id": None, "plate": "abc-123", "status": "entering"})
+    store.insert({"session_id": None, "plate": "xyz-789", "status": "entering"})
+    store.update(first["session_id"], {"status": "exited"})
+
+    assert store.active("abc-123") is None
+    assert store.latest("abc-123")["status"] == "exited"
+    assert [r["plate"] for r in store.by_status("entering")] == ["xyz-789"]
+    assert store.next_session_id() == 3
+    store.backend.close()
+
+
+def test_failed_begin_releases_the_lock(tmp_path):
+    path = str(tmp_path / "db.sqlite")
+    holder = SqliteBackend(path)
+    backend = SqliteBackend(path, timeout=0.05)
+    holder.conn.execute("BEGIN IMMEDIATE")   # another process writing
+
+    try:
+        with pytest.raises(sqlite3.OperationalError):
+            backend.insert("sessions", {"session_id": 1, "plate": "a"})
+    finally:
+        holder.conn.execute("ROLLBACK")
+
+    free = []
+
+    def other_thread():
+        free.append(backend.lock.acquire(timeout=1))
+        if free[-1]:
+            backend.lock.release()
+
+    thread = threading.Thread(target=other_thread)
+    thread.start()
+    thread.join()
+    assert free == [True]
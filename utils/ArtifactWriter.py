@@ -0,0 +1,139 @@
+import atexit
+import queue
+import threading
+
+
+class ArtifactWriter:
+    """
+    Background writer for debug images (ANPR crops, annotated lot scans).
+
+    Gate events queue a save job and return straight away; worker threads
+    do the rendering, JPEG encoding and disk writes.
+
+    When the queue is full, `policy` decides what happens:
+    - "drop_oldest": discard the oldest queued job (default, keeps the latest)
+    - "drop_newest": discard the job being submitted
+    - "block": wait for room (up to `block_timeout` seconds, then drop)
+
+    workers=0 runs every job inline, like the old synchronous behavior.
+    Pending jobs are flushed on close() and at interpreter exit.
+    """
+
+    POLICIES = ("drop_oldest", "drop_newest", "block")
+
+    def __init__(self, workers=1, max_queue=64, policy="drop_oldest",
+                 block_timeout=None):
+        if policy not in self.POLICIES:
+            raise ValueError(f"policy must be one of {self.POLICIES}")
+
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.lock = threading.Lock()
+        self.stats = {"submitted": 0, "written": 0, "dropped": 0, "failed": 0}
+        self.closed = False
+
+        self.threads = []
+        for i in range(workers):
+            thread = threading.Thread(
+                target=self._worker, name=f"artifact-writer-{i}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+        if self.threads:
+            atexit.register(self.close)
+
+    # ------------------------------------------------------------
+    # PUBLIC API
+    # ------------------------------------------------------------
+
+    def submit(self, fn, *args, **kwargs):
+        """Queue fn(*args, **kwargs). Returns False if the job was dropped."""
+        job = (fn, args, kwargs)
+        self._count("submitted")
+
+        if not self.threads or self.closed:
+            self._run(job)
+            return True
+
+        if self.policy == "block":
+            try:
+                self.queue.put(job, timeout=self.block_timeout)
+                return True
+            except queue.Full:
+                self._count("dropped")
+                return False
+
+        try:
+            self.queue.put_nowait(job)
+            return True
+        except queue.Full:
+            pass
+
+        if self.policy == "drop_newest":
+            self._count("dropped")
+            return False
+
+        # drop_oldest: make room by discarding the oldest queued job
+        try:
+            self.queue.get_nowait()
+            self.queue.task_done()
+            self._count("dropped")
+        except queue.Empty:
+            pass
+
+        try:
+            self.queue.put_nowait(job)
+            return True
+        except queue.Full:
+            self._count("dropped")
+            return False
+
+    def flush(self):
+        """Block until every queued job has been written."""
+        if self.threads:
+            self.queue.join()
+
+    def close(self):
+        """Flush pending jobs and stop the workers."""
+        if self.closed:
+            return
+        self.flush()
+        self.closed = True
+        for _ in self.threads:
+            self.queue.put(None)
+        for thread in self.threads:
+            thread.join()
+
+    def get_stats(self):
+        with self.lock:
+            stats = dict(self.stats)
+        stats["queued"] = self.queue.qsize()
+        return stats
+
+    # ------------------------------------------------------------
+    # WORKER
+    # ------------------------------------------------------------
+
+    def _count(self, key):
+        with self.lock:
+            self.stats[key] += 1
+
+    def _run(self, job):
+        fn, args, kwargs = job
+        try:
+            fn(*args, **kwargs)
+            self._count("written")
+        except Exception as e:
+            self._count("failed")
+            print(f"[WARN] Failed to write artifact: {e}")
+
+    def _worker(self):
+        while True:
+            job = self.queue.get()
+            try:
+                if job is None:
+                    return
+                self._run(job)
+            finally:
+                self.queue.task_done()
@@ -0,0 +1,170 @@
+import re
+
+# characters OCR mixes up, mapped to one representative
+CONFUSABLE = str.maketrans({
+    "O": "0", "Q": "0", "D": "0",
+    "I": "1", "L": "1",
+    "B": "8",
+    "S": "5",
+    "Z": "2",
+})
+
+
+def normalize_plate(plate):
+    """Uppercase, letters/digits only, confusable characters folded."""
+    if not plate:
+        return ""
+    return re.sub(r"[^A-Z0-9]", "", str(plate).upper()).translate(CONFUSABLE)
+
+
+def distance_to(a):
+    """
+    Levenshtein distance from `a` to any string, as a function.
+    Bit-parallel (Myers/Hyyrö): `a`'s character masks are built once and
+    each comparison is a few integer ops per character of the other string.
+    """
+    peq = {}
+    for i, ch in enumerate(a):
+        peq[ch] = peq.get(ch, 0) | (1 << i)
+    m = len(a)
+    mask = (1 << m) - 1
+    last = 1 << (m - 1) if m else 0
+
+    def distance(b):
+        if not m:
+            return len(b)
+        pv, mv, score = mask, 0, m
+        for ch in b:
+            eq = peq.get(ch, 0)
+            xv = eq | mv
+            xh = ((((eq & pv) + pv) & mask) ^ pv) | eq
+            ph = mv | (~(xh | pv) & mask)
+            mh = pv & xh
+            if ph & last:
+                score += 1
+            elif mh & last:
+                score -= 1
+            ph = ((ph << 1) | 1) & mask
+            mh = (mh << 1) & mask
+            pv = mh | (~(xv | ph) & mask)
+            mv = ph & xv
+        return score
+
+    return distance
+
+
+def edit_distance(a, b):
+    return distance_to(a)(b)
+
+
+class PlateIndex:
+    """
+    Plates searchable by similarity.
+
+    Plates are keyed by normalize_plate(), so O/0, B/8, I/1 ... misreads
+    land on the same key, and the keys sit in a BK-tree over edit distance:
+    a search within distance d only visits the subtrees whose edge label
+    is within d of the query's distance to their parent, not every plate.
+
+    add()/remove() count, so a plate added twice (two open sessions) stays
+    until removed twice. Removed keys stay in the tree, empty, until they
+    outnumber the live ones and the tree is rebuilt.
+    """
+
+    def __init__(self, max_distance=2):
+        self.max_distance = max_distance
+        self.plates = {}   # key -> {plate: count}
+        self.root = None   # [key, {distance: child}]
+        self.dead = 0
+
+    def __len__(self):
+        return sum(len(plates) for plates in self.plates.values())
+
+    def _insert(self, key):
+        if self.root is None:
+            self.root = [key, {}]
+            return
+        distance_from_key = distance_to(key)
+        node = self.root
+        while True:
+            distance = distance_from_key(node[0])
+            if distance == 0:
+                return
+            child = node[1].get(distance)
+            if child is None:
+                node[1][distance] = [key, {}]
+                return
+            node = child
+
+    def _rebuild(self):
+        self.root = None
+        self.dead = 0
+        self.plates = {key: plates for key, plates in self.plates.items() if plates}
+        for key in self.plates:
+            self._insert(key)
+
+    # ------------------------------------------------------------
+    # PUBLIC API
+    # ------------------------------------------------------------
+
+    def add(self, plate):
+        key = normalize_plate(plate)
+        if not key:
+            return
+        plates = self.plates.get(key)
+        if plates is None:
+            plates = self.plates[key] = {}
+            self._insert(key)
+        elif not plates:
+            self.dead -= 1
+        plates[plate] = plates.get(plate, 0) + 1
+
+    def remove(self, plate):
+        key = normalize_plate(plate)
+        plates = self.plates.get(key)
+        if not plates or plate not in plates:
+            return
+        plates[plate] -= 1
+        if plates[plate] <= 0:
+            del plates[plate]
+            if not plates:
+                self.dead += 1
+                if self.dead > 32 and self.dead > len(self.plates) - self.dead:
+                    self._rebuild()
+
+    def clear(self):
+        self.plates = {}
+        self.root = None
+        self.dead = 0
+
+    def search(self, plate, max_distance=None):
+        """[(plate, distance), ...] within max_distance, closest first."""
+        limit = self.max_distance if max_distance is None else max_distance
+        key = normalize_plate(plate)
+        if not key or self.root is None:
+            return []
+
+        distance_from_key = distance_to(key)
+        found = []
+        stack = [self.root]
+        while stack:
+            node_key, children = stack.pop()
+            distance = distance_from_key(node_key)
+            if distance <= limit:
+                found.extend((p, distance) for p in self.plates.get(node_key, ()))
+            for edge, child in children.items():
+                if distance - limit <= edge <= distance + limit:
+                    stack.append(child)
+
+        found.sort(key=lambda m: (m[1], m[0]))
+        return found
+
+    def best(self, plate, max_distance=None):
+        """
+        The single closest plate as (plate, distance), or None when nothing
+        is close enough or two plates tie for closest.
+        """
+        found = self.search(plate, max_distance)
+        if not found or (len(found) > 1 and found[1][1] == found[0][1]):
+            return None
+        return found[0]
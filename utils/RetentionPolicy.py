@@ -0,0 +1,123 @@
+import os
+import threading
+from collections import deque
+
+import cv2
+
+
+class RetentionPolicy:
+    """
+    Decides which debug images a pipeline stage keeps on disk.
+
+    mode:
+    - "all":       every event (old behavior)
+    - "failures":  only events flagged as failed (no plate, denied, ...)
+    - "sampled":   one event in every `sample_every`
+    - "none":      nothing
+
+    kinds:          which images to write (ANPR: rendered/gray/edged/plate)
+    jpeg_quality:   0-100, None keeps the OpenCV default (95)
+    max_folder_mb:  oldest files are deleted once a folder grows past this
+    """
+
+    MODES = ("none", "failures", "sampled", "all")
+
+    def __init__(self, mode="all", sample_every=10, kinds=None,
+                 jpeg_quality=None, max_folder_mb=None):
+        if mode not in self.MODES:
+            raise ValueError(f"mode must be one of {self.MODES}")
+
+        self.mode = mode
+        self.sample_every = max(1, int(sample_every))
+        self.kinds = tuple(kinds) if kinds else None
+        self.jpeg_quality = jpeg_quality
+        self.max_bytes = int(max_folder_mb * 1024 * 1024) if max_folder_mb else None
+
+        self.lock = threading.Lock()
+        self._events = 0
+        self._folders = {}   # folder -> [deque of (path, size), total bytes, paths]
+
+    # ------------------------------------------------------------
+    # DECISION
+    # ------------------------------------------------------------
+
+    def should_save(self, failed=False):
+        if self.mode == "all":
+            return True
+        if self.mode == "failures":
+            return bool(failed)
+        if self.mode == "sampled":
+            with self.lock:
+                keep = self._events % self.sample_every == 0
+                self._events += 1
+                return keep
+        return False
+
+    def write_params(self):
+        """Extra cv2.imwrite params for this stage."""
+        if self.jpeg_quality is None:
+            return []
+        return [cv2.IMWRITE_JPEG_QUALITY, int(self.jpeg_quality)]
+
+    # ------------------------------------------------------------
+    # WRITE + ROTATION
+    # ------------------------------------------------------------
+
+    def run(self, save, *args, **kwargs):
+        """Call a save function, then enforce the folder size cap."""
+        paths = save(*args, **kwargs)
+        if isinstance(paths, str):
+            paths = [paths]
+        self.record(paths or [])
+        return paths
+
+    def record(self, paths):
+        if not self.max_bytes:
+            return
+
+        with self.lock:
+            # scan new folders first: the batch's own files are already on
+            # disk and must only be counted once, in save order
+            batch = {os.path.normpath(path) for path in paths}
+            for path in paths:
+                self._tracked(os.path.dirname(path) or ".", skip=batch)
+
+            for path in paths:
+                folder = os.path.dirname(path) or "."
+                files, total, names = self._folders[folder]
+                key = os.path.normpath(path)
+                if key in names:
+                    continue
+                try:
+                    size = os.path.getsize(path)
+                except OSError:
+                    continue
+                files.append((path, size))
+                names.add(key)
+                total += size
+
+                while total > self.max_bytes and files:
+                    old_path, old_size = files.popleft()
+                    names.discard(os.path.normpath(old_path))
+                    try:
+                        os.remove(old_path)
+                    except OSError:
+                        pass
+                    total -= old_size
+
+                self._folders[folder] = [files, total, names]
+
+    def _tracked(self, folder, skip=()):
+        """Existing files of a folder, oldest first (scanned once)."""
+        if folder not in self._folders:
+            entries = []
+            if os.path.isdir(folder):
+                for entry in os.scandir(folder):
+                    if entry.is_file() and os.path.normpath(entry.path) not in skip:
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, entry.path, stat.st_size))
+            entries.sort()
+            files = deque((path, size) for _, path, size in entries)
+            names = {os.path.normpath(path) for path, _ in files}
+            self._folders[folder] = [files, sum(size for _, size in files), names]
+        return self._folders[folder]